@@ -0,0 +1,64 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import cint, now_datetime
+
+import zajel_general
+
+
+def check_test_site():
+	"""Benchmarks write (and roll back) synthetic data, refuse to run on a site not meant for tests."""
+	if not cint(frappe.conf.get("allow_tests")):
+		frappe.throw(
+			"Benchmarks only run on a local test site, enable them with: bench --site <site> set-config allow_tests true"
+		)
+
+
+def get_query_count():
+	# queries run on this connection, the status query itself included
+	return cint(frappe.db.sql("show session status like 'Questions'")[0][1])
+
+
+@contextmanager
+def measure(result, count=1):
+	"""
+	Fill `result` with the wall time, query count and peak python memory of the block,
+	plus the time per item when the block handles `count` items.
+	"""
+	tracemalloc.start()
+	queries = get_query_count()
+	start = time.perf_counter()
+	try:
+		yield result
+	finally:
+		seconds = time.perf_counter() - start
+		result["queries"] = get_query_count() - queries - 1
+		result["peak_memory_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+		tracemalloc.stop()
+		result["seconds"] = round(seconds, 4)
+		result["ms_per_item"] = round(seconds * 1000 / count, 4) if count else None
+
+
+def write_results(name, results, output=None):
+	"""Write `results` as JSON (to `output`, or under the site's private/benchmarks), return the path."""
+	results = {
+		"benchmark": name,
+		"timestamp": str(now_datetime()),
+		"site": frappe.local.site,
+		"versions": {"zajel_general": zajel_general.__version__, "frappe": frappe.__version__},
+		**results,
+	}
+
+	if not output:
+		folder = frappe.get_site_path("private", "benchmarks")
+		os.makedirs(folder, exist_ok=True)
+		output = os.path.join(folder, "{0}-{1}.json".format(name, now_datetime().strftime("%Y%m%d-%H%M%S")))
+
+	with open(output, "w") as f:
+		json.dump(results, f, indent=1, default=str)
+
+	return output
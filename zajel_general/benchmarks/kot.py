@@ -0,0 +1,289 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+from frappe.utils import cint, now, nowdate
+
+from zajel_general.benchmarks import check_test_site, get_query_count, write_results
+
+ITEMS_PER_TICKET = 3
+
+
+def run(terminals=4, screens=2, tickets=1000, mode="doc", batch_size=10, output=None):
+	"""
+	Load test the KOT path: `terminals` threads create tickets for synthetic Sales Invoices while
+	`screens` threads claim, complete and deliver their items. In "doc" mode every ticket is a
+	document insert (validate and the doc_events hooks run), in "batch" mode tickets are created
+	`batch_size` at a time by the batch endpoint. Every thread has its own connection and commits
+	after each call, like a request would. The synthetic data is deleted afterwards.
+	"""
+	check_test_site()
+	if mode not in ("doc", "batch"):
+		frappe.throw(f"Unknown mode {mode}, use doc or batch")
+
+	site = frappe.local.site
+	run_id = frappe.generate_hash(length=8)
+	prefix = f"BENCH-{run_id}"
+
+	try:
+		invoices = setup(prefix, tickets)
+		frappe.db.commit()
+
+		lock_stats = get_lock_stats()
+		terminals_done = threading.Event()
+		start = time.perf_counter()
+
+		with ThreadPoolExecutor(max_workers=terminals + screens) as pool:
+			screen_jobs = [
+				pool.submit(run_in_site, site, screen_worker, prefix, terminals_done) for _ in range(screens)
+			]
+			terminal_jobs = [
+				pool.submit(run_in_site, site, terminal_worker, invoices[i::terminals], mode, batch_size)
+				for i in range(terminals)
+			]
+			try:
+				terminal_results = [job.result() for job in terminal_jobs]
+			finally:
+				terminals_done.set()
+			screen_results = [job.result() for job in screen_jobs]
+
+		seconds = time.perf_counter() - start
+		lock_stats = {key: value - lock_stats.get(key, 0) for key, value in get_lock_stats().items()}
+	finally:
+		frappe.db.rollback()
+		cleanup(prefix)
+		frappe.db.commit()
+
+	results = {
+		"terminals": terminals,
+		"screens": screens,
+		"tickets": tickets,
+		"mode": mode,
+		"batch_size": batch_size if mode == "batch" else None,
+		"seconds": round(seconds, 3),
+		"tickets_per_second": round(tickets / seconds, 2) if seconds else None,
+		"items_per_second": round(tickets * ITEMS_PER_TICKET / seconds, 2) if seconds else None,
+		"create": summarize(terminal_results),
+		"advance": summarize(screen_results),
+		"lock_waits": lock_stats,
+	}
+	return write_results("kot", results, output)
+
+
+def setup(prefix, count):
+	"""
+	An Item Group with its own Items and Kitchen Station, so that no other station takes the
+	benchmark's items, and `count` submitted Sales Invoices with ITEMS_PER_TICKET items each.
+	"""
+	company = frappe.db.get_value("Company", {}, "name")
+	uom = frappe.db.get_value("UOM", {}, "name")
+	root = frappe.db.get_value("Item Group", {"parent_item_group": ("is", "not set")}, "name")
+	if not (company and uom and root):
+		frappe.throw("The benchmark needs a Company, a UOM and the root Item Group on the test site")
+
+	timestamp, user, today = now(), frappe.session.user, nowdate()
+	frappe.db.bulk_insert(
+		"Item Group",
+		("name", "creation", "modified", "owner", "modified_by", "item_group_name", "parent_item_group"),
+		[(prefix, timestamp, timestamp, user, user, prefix, root)],
+	)
+	items = [f"{prefix}-ITEM-{idx}" for idx in range(1, ITEMS_PER_TICKET + 1)]
+	frappe.db.bulk_insert(
+		"Item",
+		("name", "creation", "modified", "owner", "modified_by", "item_code", "item_name", "item_group", "stock_uom"),
+		[(item, timestamp, timestamp, user, user, item, item, prefix, uom) for item in items],
+	)
+	frappe.get_doc(
+		{"doctype": "Kitchen Station", "station_name": prefix, "item_groups": [{"item_group": prefix}]}
+	).insert(ignore_permissions=True)
+
+	invoices = [f"{prefix}-SINV-{i:06d}" for i in range(count)]
+	frappe.db.bulk_insert(
+		"Sales Invoice",
+		("name", "creation", "modified", "owner", "modified_by", "docstatus", "company", "posting_date"),
+		[(name, timestamp, timestamp, user, user, 1, company, today) for name in invoices],
+	)
+	frappe.db.bulk_insert(
+		"Sales Invoice Item",
+		(
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"docstatus",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			"item_code",
+			"item_name",
+			"item_group",
+			"qty",
+			"uom",
+		),
+		[
+			(
+				f"{name}-{idx}",
+				timestamp,
+				timestamp,
+				user,
+				user,
+				1,
+				name,
+				"Sales Invoice",
+				"items",
+				idx,
+				item,
+				item,
+				prefix,
+				1,
+				uom,
+			)
+			for name in invoices
+			for idx, item in enumerate(items, 1)
+		],
+	)
+	return invoices
+
+
+def cleanup(prefix):
+	from zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_queue import QUEUE_KEY, STATUS_COUNTS_KEY
+	from zajel_general.zajel_general.doctype.kitchen_station.kitchen_station import clear_station_map
+
+	pattern = f"{prefix}-SINV-%"
+	tickets = frappe.get_all("Kitchen Order Ticket", filters={"sales_invoice": ("like", pattern)}, pluck="name")
+	if tickets:
+		frappe.db.delete("Kitchen Order Ticket Item", {"parent": ("in", tickets)})
+		frappe.db.delete("Kitchen Order Ticket", {"name": ("in", tickets)})
+		frappe.cache.delete(*[frappe.cache.make_key(STATUS_COUNTS_KEY.format(name)) for name in tickets])
+	frappe.db.delete("Series", {"name": ("like", f"KOT - {pattern}")})
+	frappe.db.delete("Sales Invoice Item", {"parent": ("like", pattern)})
+	frappe.db.delete("Sales Invoice", {"name": ("like", pattern)})
+	frappe.db.delete("Kitchen Timing Aggregate", {"station": prefix})
+	frappe.db.delete("Kitchen Station Item Group", {"parent": prefix})
+	frappe.db.delete("Kitchen Station", {"name": prefix})
+	frappe.db.delete("Item", {"item_group": prefix})
+	frappe.db.delete("Item Group", {"name": prefix})
+
+	frappe.cache.delete(frappe.cache.make_key(QUEUE_KEY.format(prefix)))
+	clear_station_map()
+
+
+def run_in_site(site, worker, *args):
+	frappe.init(site=site)
+	frappe.connect()
+	frappe.set_user("Administrator")
+	try:
+		queries = get_query_count()
+		result = worker(*args)
+		result["queries"] = get_query_count() - queries - 1
+		return result
+	finally:
+		frappe.destroy()
+
+
+def terminal_worker(invoices, mode, batch_size):
+	from zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_order_ticket_batch import (
+		create_kitchen_order_tickets,
+	)
+	from zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_queue import make_kitchen_order_ticket
+
+	if mode == "batch":
+		calls = [
+			(create_kitchen_order_tickets, [{"sales_invoice": name} for name in invoices[i : i + batch_size]])
+			for i in range(0, len(invoices), batch_size)
+		]
+	else:
+		calls = [(make_kitchen_order_ticket, name) for name in invoices]
+
+	latencies, errors = {"create": []}, 0
+	for method, arg in calls:
+		start = time.perf_counter()
+		try:
+			method(arg)
+			frappe.db.commit()
+		except Exception:
+			frappe.db.rollback()
+			errors += 1
+		latencies["create"].append(time.perf_counter() - start)
+
+	return {"latencies": latencies, "errors": errors}
+
+
+def screen_worker(station, terminals_done):
+	from zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_queue import (
+		claim_next_item,
+		complete_item,
+		deliver_item,
+	)
+
+	latencies, errors = {"claim": [], "complete": [], "deliver": []}, 0
+	while True:
+		start = time.perf_counter()
+		try:
+			item = claim_next_item(station)
+			frappe.db.commit()
+		except Exception:
+			frappe.db.rollback()
+			errors += 1
+			if terminals_done.is_set():
+				break
+			continue
+
+		if not item:
+			if terminals_done.is_set():
+				break
+			time.sleep(0.01)
+			continue
+		latencies["claim"].append(time.perf_counter() - start)
+
+		for operation, advance in (("complete", complete_item), ("deliver", deliver_item)):
+			start = time.perf_counter()
+			try:
+				advance(item.name)
+				frappe.db.commit()
+			except Exception:
+				frappe.db.rollback()
+				errors += 1
+			latencies[operation].append(time.perf_counter() - start)
+
+	return {"latencies": latencies, "errors": errors}
+
+
+def get_lock_stats():
+	# server wide counters, the run's share is the difference before and after it
+	return {
+		key: cint(value)
+		for key, value in frappe.db.sql(
+			"""show global status where Variable_name in
+			('Innodb_row_lock_waits', 'Innodb_row_lock_time', 'Innodb_deadlocks')"""
+		)
+	}
+
+
+def summarize(results):
+	"""Call count and latency percentiles per operation, with the errors and queries of all threads."""
+	summary = {
+		"errors": sum(result["errors"] for result in results),
+		"queries": sum(result["queries"] for result in results),
+	}
+	for operation in results[0]["latencies"] if results else []:
+		latencies = sorted(latency for result in results for latency in result["latencies"][operation])
+		summary[operation] = {
+			"calls": len(latencies),
+			"p50_ms": get_percentile_ms(latencies, 50),
+			"p95_ms": get_percentile_ms(latencies, 95),
+			"max_ms": round(latencies[-1] * 1000, 3) if latencies else None,
+		}
+	return summary
+
+
+def get_percentile_ms(latencies, percentile):
+	# nearest rank
+	if not latencies:
+		return None
+	index = min(len(latencies) - 1, max(0, math.ceil(len(latencies) * percentile / 100) - 1))
+	return round(latencies[index] * 1000, 3)
@@ -0,0 +1,330 @@
+import random
+
+import frappe
+from frappe.utils import add_days, get_first_day, get_last_day, getdate, now, nowdate
+
+from zajel_general.benchmarks import check_test_site, measure, write_results
+from zajel_general.custom.salary_slip_custom import (
+	ANNUAL_LEAVE_TYPE,
+	apply_annual_leave_deduction,
+	bump_flags_version,
+	get_custom_annual_leave_days_from_leave_applications,
+)
+
+SCALES = (100, 1000, 10000)
+
+# earnings of the synthetic salary structure: (component, abbreviation, monthly amount, paid during annual leave)
+STRUCTURE_EARNINGS = (
+	("Basic Salary", "BS", 6000, 1),
+	("Housing Allowance", "HA", 2500, 1),
+	("Transport Allowance", "TA", 800, 0),
+	("Food Allowance", "FA", 500, 0),
+	("Overtime", "OT", 300, 0),
+)
+
+
+def run(scales=SCALES, output=None, seed=42):
+	"""
+	Time the annual leave deduction per slip and per payroll run at each scale, then write
+	the results as JSON. The synthetic data is rolled back after each scale.
+	"""
+	check_test_site()
+	company = frappe.db.get_value("Company", {}, "name")
+	if not company:
+		frappe.throw("The benchmark needs a Company on the test site")
+
+	results = []
+	for scale in scales:
+		try:
+			results.append(run_scale(int(scale), company, random.Random(seed)))
+		finally:
+			frappe.db.rollback()
+			# the cached component flags include the rolled back components
+			bump_flags_version()
+
+	return write_results("payroll", {"scales": results}, output)
+
+
+def run_scale(scale, company, rng):
+	start_date = getdate(get_first_day(nowdate()))
+	end_date = getdate(get_last_day(start_date))
+	run_id = frappe.generate_hash(length=8)
+	payroll_entry = f"BENCH-PE-{run_id}"
+
+	employees = make_employees(scale, company)
+	salary_structure = make_salary_structure(run_id, company)
+	make_salary_structure_assignments(salary_structure, employees, company, start_date)
+	bump_flags_version()
+	make_payroll_employees(payroll_entry, employees)
+	leave_count = make_leave_applications(employees, company, start_date, end_date, rng)
+
+	result = {"scale": scale, "leave_applications": leave_count}
+
+	result["leave_days_per_slip"] = {}
+	with measure(result["leave_days_per_slip"], scale):
+		for employee in employees:
+			get_custom_annual_leave_days_from_leave_applications(employee, start_date, end_date, ANNUAL_LEAVE_TYPE)
+
+	slips = make_slips(employees, salary_structure, company, start_date, end_date)
+	result["deduction_per_slip"] = {}
+	with measure(result["deduction_per_slip"], scale):
+		for slip in slips:
+			apply_annual_leave_deduction(slip)
+
+	slips = make_slips(employees, salary_structure, company, start_date, end_date, payroll_entry)
+	frappe.flags.pop("payroll_annual_leave_days", None)
+	result["deduction_payroll_run"] = {}
+	with measure(result["deduction_payroll_run"], scale):
+		for slip in slips:
+			apply_annual_leave_deduction(slip)
+
+	return result
+
+
+def make_employees(scale, company):
+	timestamp, user = now(), frappe.session.user
+	names = [f"BENCH-EMP-{frappe.generate_hash(length=10)}" for _ in range(scale)]
+	frappe.db.bulk_insert(
+		"Employee",
+		(
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"first_name",
+			"employee_name",
+			"company",
+			"status",
+			"gender",
+			"date_of_birth",
+			"date_of_joining",
+		),
+		[
+			(name, timestamp, timestamp, user, user, name, name, company, "Active", "Male", "1990-01-01", "2020-01-01")
+			for name in names
+		],
+	)
+	return names
+
+
+def make_salary_structure(run_id, company):
+	"""A submitted Salary Structure with STRUCTURE_EARNINGS, on components of its own."""
+	timestamp, user = now(), frappe.session.user
+	currency = frappe.get_cached_value("Company", company, "default_currency")
+	name = f"BENCH-SS-{run_id}"
+	components = [(f"{component} {run_id}", *rest) for component, *rest in STRUCTURE_EARNINGS]
+
+	frappe.db.bulk_insert(
+		"Salary Component",
+		(
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"salary_component",
+			"salary_component_abbr",
+			"type",
+			"depends_on_payment_days",
+			"custom_paid_during_annual_leave",
+		),
+		[
+			(component, timestamp, timestamp, user, user, component, f"{abbr}{run_id}", "Earning", 1, paid)
+			for component, abbr, _amount, paid in components
+		],
+	)
+	frappe.db.bulk_insert(
+		"Salary Structure",
+		(
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"docstatus",
+			"company",
+			"currency",
+			"is_active",
+			"payroll_frequency",
+		),
+		[(name, timestamp, timestamp, user, user, 1, company, currency, "Yes", "Monthly")],
+	)
+	frappe.db.bulk_insert(
+		"Salary Detail",
+		(
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"docstatus",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			"salary_component",
+			"abbr",
+			"amount",
+			"depends_on_payment_days",
+		),
+		[
+			(
+				frappe.generate_hash(),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				1,
+				name,
+				"Salary Structure",
+				"earnings",
+				idx,
+				component,
+				f"{abbr}{run_id}",
+				amount,
+				1,
+			)
+			for idx, (component, abbr, amount, _paid) in enumerate(components, 1)
+		],
+	)
+	return name
+
+
+def make_salary_structure_assignments(salary_structure, employees, company, from_date):
+	timestamp, user = now(), frappe.session.user
+	currency = frappe.get_cached_value("Company", company, "default_currency")
+	frappe.db.bulk_insert(
+		"Salary Structure Assignment",
+		(
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"docstatus",
+			"employee",
+			"employee_name",
+			"salary_structure",
+			"company",
+			"currency",
+			"from_date",
+			"base",
+		),
+		[
+			(
+				frappe.generate_hash(),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				1,
+				employee,
+				employee,
+				salary_structure,
+				company,
+				currency,
+				from_date,
+				sum(d[2] for d in STRUCTURE_EARNINGS),
+			)
+			for employee in employees
+		],
+	)
+
+
+def make_payroll_employees(payroll_entry, employees):
+	timestamp, user = now(), frappe.session.user
+	frappe.db.bulk_insert(
+		"Payroll Employee Detail",
+		("name", "creation", "modified", "owner", "modified_by", "parent", "parenttype", "parentfield", "idx", "employee"),
+		[
+			(frappe.generate_hash(), timestamp, timestamp, user, user, payroll_entry, "Payroll Entry", "employees", i, employee)
+			for i, employee in enumerate(employees, 1)
+		],
+	)
+
+
+def make_leave_applications(employees, company, start_date, end_date, rng):
+	"""Up to two Approved Annual Leave applications per employee around the period, some with a half day."""
+	timestamp, user = now(), frappe.session.user
+	values = []
+	for employee in employees:
+		for _ in range(rng.randint(0, 2)):
+			from_date = add_days(start_date, rng.randint(-10, 25))
+			to_date = add_days(from_date, rng.randint(0, 12))
+			half_day_date = add_days(from_date, rng.randint(0, (getdate(to_date) - getdate(from_date)).days))
+			half_day = rng.random() < 0.2
+			values.append(
+				(
+					frappe.generate_hash(),
+					timestamp,
+					timestamp,
+					user,
+					user,
+					1,
+					employee,
+					employee,
+					company,
+					ANNUAL_LEAVE_TYPE,
+					from_date,
+					to_date,
+					1 if half_day else 0,
+					half_day_date if half_day else None,
+					"Approved",
+					start_date,
+				)
+			)
+
+	frappe.db.bulk_insert(
+		"Leave Application",
+		(
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"docstatus",
+			"employee",
+			"employee_name",
+			"company",
+			"leave_type",
+			"from_date",
+			"to_date",
+			"half_day",
+			"half_day_date",
+			"status",
+			"posting_date",
+		),
+		values,
+	)
+	return len(values)
+
+
+def make_slips(employees, salary_structure, company, start_date, end_date, payroll_entry=None):
+	"""Unsaved Salary Slips with the salary structure's earnings, as the slip hook sees them."""
+	earnings = frappe.get_all(
+		"Salary Detail",
+		filters={"parenttype": "Salary Structure", "parent": salary_structure, "parentfield": "earnings"},
+		fields=["salary_component", "abbr", "amount"],
+		order_by="idx asc",
+	)
+	slips = []
+	for employee in employees:
+		slip = frappe.new_doc("Salary Slip")
+		slip.update(
+			{
+				"employee": employee,
+				"company": company,
+				"start_date": start_date,
+				"end_date": end_date,
+				"salary_structure": salary_structure,
+				"payroll_entry": payroll_entry,
+				"payment_days": 30,
+				"total_working_days": 30,
+			}
+		)
+		for d in earnings:
+			slip.append("earnings", {"salary_component": d.salary_component, "abbr": d.abbr, "amount": d.amount})
+		slips.append(slip)
+
+	return slips
@@ -0,0 +1,103 @@
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("rebuild-pos-sales-rollup")
+@click.option("--company", help="Only rebuild this company")
+@click.option("--from-date", help="First posting date to rebuild (default: earliest invoice)")
+@click.option("--to-date", help="Last posting date to rebuild (default: latest invoice)")
+@pass_context
+def rebuild_pos_sales_rollup(context, company=None, from_date=None, to_date=None):
+	"Backfill the POS Sales Rollup table from submitted Sales Invoices"
+	import frappe
+
+	from zajel_general.zajel_general.doctype.pos_sales_rollup.pos_sales_rollup import (
+		rebuild_pos_sales_rollup as rebuild,
+	)
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		count = rebuild(company=company, from_date=from_date, to_date=to_date, commit=True)
+	finally:
+		frappe.destroy()
+
+	click.echo(f"POS Sales Rollup rebuilt: {count} rows")
+
+
+@click.command("check-report-query-plans")
+@click.option("--company", help="Company to build the report queries for (default: any)")
+@pass_context
+def check_report_query_plans(context, company=None):
+	"Run EXPLAIN on the generated report queries and fail on full table scans"
+	import frappe
+
+	from zajel_general.indexes import check_report_query_plans as check
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		failures = check(company=company)
+	finally:
+		frappe.destroy()
+
+	for failure in failures:
+		click.secho(failure, fg="red")
+
+	if failures:
+		raise click.ClickException(f"{len(failures)} report queries do full table scans")
+
+	click.secho("No full table scans in report queries", fg="green")
+
+
+@click.command("run-payroll-benchmark")
+@click.option("--scale", "scales", multiple=True, type=int, help="Employees per run (default: 100, 1000 and 10000)")
+@click.option("--output", help="JSON file to write (default: private/benchmarks on the site)")
+@pass_context
+def run_payroll_benchmark(context, scales=None, output=None):
+	"Benchmark the annual leave deduction on synthetic payroll data, on a test site only"
+	import frappe
+
+	from zajel_general.benchmarks.payroll import SCALES, run
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		path = run(scales=scales or SCALES, output=output)
+	finally:
+		frappe.destroy()
+
+	click.echo(f"Payroll benchmark written to {path}")
+
+
+@click.command("run-kot-benchmark")
+@click.option("--terminals", type=int, default=4, help="Threads creating Kitchen Order Tickets")
+@click.option("--screens", type=int, default=2, help="Threads claiming, completing and delivering items")
+@click.option("--tickets", type=int, default=1000, help="Synthetic Sales Invoices to ticket")
+@click.option("--mode", type=click.Choice(["doc", "batch"]), default="doc", help="Insert documents or use the batch endpoint")
+@click.option("--batch-size", type=int, default=10, help="Tickets per batch call, in batch mode")
+@click.option("--output", help="JSON file to write the results to")
+@pass_context
+def run_kot_benchmark(context, terminals=4, screens=2, tickets=1000, mode="doc", batch_size=10, output=None):
+	"Load test Kitchen Order Ticket creation and kitchen screens on synthetic data, on a test site only"
+	import frappe
+
+	from zajel_general.benchmarks.kot import run
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		path = run(
+			terminals=terminals, screens=screens, tickets=tickets, mode=mode, batch_size=batch_size, output=output
+		)
+	finally:
+		frappe.destroy()
+
+	click.echo(f"KOT benchmark written to {path}")
+
+
+commands = [rebuild_pos_sales_rollup, check_report_query_plans, run_payroll_benchmark, run_kot_benchmark]
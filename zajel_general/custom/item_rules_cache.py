@@ -0,0 +1,141 @@
+import frappe
+from frappe.utils import cint
+
+from zajel_general.utils import LRUCache, get_counters, incr_counters, reset_counters
+
+# Item validation rules (allowed UOMs, conversion factors, allowed suppliers, stock UOM)
+# are cached per item in redis and in a per-worker LRU. Each item has a version number
+# in redis which is bumped on every change; a cached entry is only used while its
+# version matches.
+RULES_KEY = "zajel_general:item_rules"
+VERSION_KEY = "zajel_general:item_rules_version"
+STATS_KEY = "zajel_general:item_rules_stats"
+LOCAL_CACHE_SIZE = 4096
+
+_local_cache = LRUCache(LOCAL_CACHE_SIZE)
+
+
+def new_item_rules():
+    return {"uoms": [], "conversion_factors": {}, "suppliers": [], "stock_uom": None}
+
+
+def get_item_rules(item_codes):
+    """Return {item_code: rules} for `item_codes`, reading the database only for cache misses."""
+    item_codes = list({d for d in item_codes if d})
+    if not item_codes:
+        return {}
+
+    versions = get_versions(item_codes)
+    rules, missing = {}, []
+    stats = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+
+    for item_code in item_codes:
+        version = versions[item_code]
+        local_key = (frappe.local.site, item_code)
+
+        cached = _local_cache.get(local_key)
+        if cached and cached["version"] == version:
+            rules[item_code] = cached["rules"]
+            stats["local_hits"] += 1
+            continue
+
+        cached = frappe.cache.hget(RULES_KEY, item_code)
+        if cached and cached["version"] == version:
+            _local_cache.set(local_key, cached)
+            rules[item_code] = cached["rules"]
+            stats["redis_hits"] += 1
+            continue
+
+        missing.append(item_code)
+
+    if missing:
+        stats["misses"] = len(missing)
+        loaded = load_item_rules(missing)
+        for item_code in missing:
+            cached = {"version": versions[item_code], "rules": loaded.get(item_code) or new_item_rules()}
+            frappe.cache.hset(RULES_KEY, item_code, cached)
+            _local_cache.set((frappe.local.site, item_code), cached)
+            rules[item_code] = cached["rules"]
+
+    incr_counters(STATS_KEY, stats)
+    return rules
+
+
+def load_item_rules(item_codes):
+    """Load UOM, supplier and stock UOM rules for all `item_codes` in three queries.
+
+    Returns {item_code: {"uoms", "conversion_factors", "suppliers", "stock_uom"}}.
+    """
+    rules = {item_code: new_item_rules() for item_code in item_codes}
+
+    for d in frappe.get_all(
+        "UOM Conversion Detail",
+        filters={"parent": ("in", item_codes)},
+        fields=["parent", "uom", "conversion_factor"],
+    ):
+        item = rules.setdefault(d.parent, new_item_rules())
+        item["uoms"].append(d.uom)
+        # keep the first match, as frappe.db.get_value would
+        item["conversion_factors"].setdefault(d.uom, d.conversion_factor)
+
+    for d in frappe.get_all(
+        "Item Supplier",
+        filters={"parent": ("in", item_codes)},
+        fields=["parent", "supplier"],
+    ):
+        rules.setdefault(d.parent, new_item_rules())["suppliers"].append(d.supplier)
+
+    for d in frappe.get_all(
+        "Item",
+        filters={"name": ("in", item_codes)},
+        fields=["name", "stock_uom"],
+    ):
+        rules.setdefault(d.name, new_item_rules())["stock_uom"] = d.stock_uom
+
+    return rules
+
+
+def get_versions(item_codes):
+    """Current cache version of each item, fetched from redis in one round trip."""
+    values = frappe.cache.hmget(frappe.cache.make_key(VERSION_KEY), item_codes)
+    return {item_code: cint(frappe.safe_decode(value)) for item_code, value in zip(item_codes, values)}
+
+
+def invalidate_item_rules(doc, method=None, *args):
+    """doc_events hook for Item, UOM Conversion Detail and Item Supplier."""
+    item_codes = [doc.name if doc.doctype == "Item" else doc.parent]
+    if method == "after_rename" and args:
+        # (old_name, new_name, merge)
+        item_codes.append(args[0])
+
+    item_codes = [d for d in item_codes if d]
+    if not item_codes:
+        return
+
+    bump_versions(item_codes)
+    # bump again once the change is visible to other connections, so that a concurrent
+    # reader cannot cache pre-commit rows under the new version
+    frappe.db.after_commit.add(lambda: bump_versions(item_codes))
+
+
+def bump_versions(item_codes):
+    version_key = frappe.cache.make_key(VERSION_KEY)
+    pipe = frappe.cache.pipeline()
+    for item_code in item_codes:
+        pipe.hincrby(version_key, item_code, 1)
+    pipe.execute()
+
+    for item_code in item_codes:
+        frappe.cache.hdel(RULES_KEY, item_code)
+        _local_cache.pop((frappe.local.site, item_code))
+
+
+@frappe.whitelist()
+def get_item_rules_cache_stats(reset=False):
+    frappe.only_for("System Manager")
+
+    stats = get_counters(STATS_KEY)
+    stats["local_size"] = len(_local_cache)
+    if cint(reset):
+        reset_counters(STATS_KEY)
+    return stats
@@ -0,0 +1,45 @@
+from frappe.utils import getdate
+
+from zajel_general.zajel_general.report.profit_and_loss_tabrah.period_snapshots import (
+    clear_closed_till,
+    delete_snapshots,
+    get_closed_till,
+)
+
+# account details stored in the snapshot rows, a change to any of them (or to the tree) makes them stale
+SNAPSHOT_ACCOUNT_FIELDS = ("account_name", "parent_account", "is_group", "account_type", "include_in_gross")
+
+
+def on_period_closing_submit(doc, method=None):
+    clear_closed_till(doc.company)
+
+
+def on_period_closing_cancel(doc, method=None):
+    """The cancelled voucher's periods are open again, drop their snapshots."""
+    clear_closed_till(doc.company)
+    delete_snapshots(doc.company, after=get_closed_till(doc.company))
+
+
+def on_gl_entry_submit(doc, method=None):
+    """A GL entry posted into a closed period invalidates the snapshots covering its date."""
+    if doc.voucher_type == "Period Closing Voucher":
+        return
+
+    closed_till = get_closed_till(doc.company)
+    if closed_till and getdate(doc.posting_date) <= closed_till:
+        delete_snapshots(doc.company, posting_date=getdate(doc.posting_date))
+
+
+def on_account_update(doc, method=None):
+    """A moved or renamed account changes the tree (parents, indents) the snapshots were taken from."""
+    # a new account has no balance in any snapshot yet
+    if not doc.get_doc_before_save():
+        return
+
+    if any(doc.has_value_changed(field) for field in SNAPSHOT_ACCOUNT_FIELDS):
+        delete_snapshots(doc.company)
+
+
+def clear_account_snapshots(doc, method=None, *args):
+    """after_rename / on_trash hook of Account."""
+    delete_snapshots(doc.company)
@@ -1,17 +1,22 @@
 import frappe
 from frappe import _
 
+from zajel_general.custom.item_rules_cache import get_item_rules, new_item_rules
+
 def validate(doc, method):
     """Restrict UOM to only those defined in Item UOM Conversion."""
+    item_rules = get_item_rules({row.item_code for row in doc.items})
+
+    if doc.doctype == 'Material Request':
+        supplier = doc.get("custom_supplier")
+    else:
+        supplier = doc.get("supplier")
+
     for row in doc.items:
+        rules = item_rules.get(row.item_code) or new_item_rules()
+
         # Get allowed UOMs for the Item
-        allowed_uoms = [
-            d.uom for d in frappe.get_all(
-                "UOM Conversion Detail", 
-                filters={"parent": row.item_code}, 
-                fields=["uom"]
-            )
-        ]
+        allowed_uoms = rules["uoms"]
 
         # If UOM list exists and selected UOM not in it → block
         if allowed_uoms and row.uom not in allowed_uoms:
@@ -19,17 +24,8 @@ def validate(doc, method):
                 "UOM <b>{0}</b> is not allowed for Item <b>{1}</b>. Allowed: {2}"
             ).format(row.uom, row.item_code, ", ".join(allowed_uoms)))
 
-        
-        allowed_suppliers = frappe.get_all(
-            "Item Supplier",
-            filters={"parent": row.item_code},
-            pluck="supplier"
-        )
-
-        if doc.doctype == 'Material Request':
-            supplier = doc.custom_supplier
-        else:
-            supplier = doc.supplier
+        allowed_suppliers = rules["suppliers"]
+
         # if no suppliers are set, allow all
         if allowed_suppliers and supplier not in allowed_suppliers:
             frappe.throw(
@@ -37,18 +33,14 @@ def validate(doc, method):
                     row.idx, supplier, row.item_code, ", ".join(allowed_suppliers)
                 )
             )
-        
-        stock_uom = frappe.db.get_value("Item", row.item_code, "stock_uom")
+
+        stock_uom = rules["stock_uom"]
         if stock_uom and row.stock_uom != stock_uom:
             row.stock_uom = stock_uom
 
         # Always refresh conversion_factor
         if row.uom:
-            conversion_factor = frappe.db.get_value(
-                "UOM Conversion Detail",
-                {"parent": row.item_code, "uom": row.uom},
-                "conversion_factor"
-            )
+            conversion_factor = rules["conversion_factors"].get(row.uom)
             if not conversion_factor:
                 # fallback: if UOM is same as stock_uom, factor=1
                 if row.uom == stock_uom:
@@ -59,4 +51,4 @@ def validate(doc, method):
                         .format(row.idx, row.uom, row.item_code)
                     )
 
-            row.conversion_factor = conversion_factor
\ No newline at end of file
+            row.conversion_factor = conversion_factor
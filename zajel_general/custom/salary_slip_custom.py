@@ -1,8 +1,14 @@
 import frappe
-from frappe.utils import flt, getdate
+from frappe.utils import cint, flt, getdate
+
+# Salary Component flags ({component: {"paid_during_annual_leave": 0/1}}) are cached in
+# redis and per worker; a version number in redis is bumped whenever a component changes
+FLAGS_KEY = "zajel_general:salary_component_flags"
+FLAGS_VERSION_KEY = "zajel_general:salary_component_flags_version"
+NO_FLAGS = {"paid_during_annual_leave": 0}
+
+_local_flags = {}
 
-# 1) Keep these exactly as your *labels*, but we normalize to lower-case once.
-ALLOWED_EARNINGS = {s.lower() for s in ["Basic Salary", "Housing Allowance", "Sales Commission", "Arrear", "Reimbursement", "Advance Salary Paid", "Overtime", "Sales Tips", "Bonus", "Leave Encashment"]}   # fully paid during annual leave
 ANNUAL_LEAVE_TYPE = "Annual Leave"                                              # exact Leave Type name
 DEDUCTION_COMPONENT = "Annual Leave"                                            # existing Deduction-type Salary Component
 
@@ -15,12 +21,21 @@ def apply_annual_leave_deduction(doc, method=None):
 
     # --- 2) Fallback to Leave Applications overlap ---------------------------
     if not custom_annual_leave_days:
-        custom_annual_leave_days = get_custom_annual_leave_days_from_leave_applications(
-            employee=doc.employee,
-            start_date=doc.start_date,
-            end_date=doc.end_date,
-            leave_type=ANNUAL_LEAVE_TYPE,
-        )
+        if doc.get("payroll_entry"):
+            # slips of a payroll run share one query for all of the run's employees
+            custom_annual_leave_days = get_payroll_annual_leave_days(
+                payroll_entry=doc.payroll_entry,
+                start_date=doc.start_date,
+                end_date=doc.end_date,
+                leave_type=ANNUAL_LEAVE_TYPE,
+            ).get(doc.employee, 0.0)
+        else:
+            custom_annual_leave_days = get_custom_annual_leave_days_from_leave_applications(
+                employee=doc.employee,
+                start_date=doc.start_date,
+                end_date=doc.end_date,
+                leave_type=ANNUAL_LEAVE_TYPE,
+            )
 
     # Optional: store for visibility only if field exists
     if hasattr(doc, "custom_annual_leave_days"):
@@ -31,13 +46,14 @@ def apply_annual_leave_deduction(doc, method=None):
         return
 
     # --- 3) Sum earnings NOT paid during annual leave ------------------------
-    total_earnings = sum(flt(e.amount) for e in (doc.get("earnings") or []))
-
+    component_flags = get_component_flags()
+    total_earnings = 0.0
     allowed_during_annual = 0.0
     for e in (doc.get("earnings") or []):
-        comp_name = (e.salary_component or "").strip().lower()
-        if comp_name in ALLOWED_EARNINGS:
-            allowed_during_annual += flt(e.amount)
+        amount = flt(e.amount)
+        total_earnings += amount
+        if component_flags.get(e.salary_component, NO_FLAGS)["paid_during_annual_leave"]:
+            allowed_during_annual += amount
 
     non_allowed_monthly = total_earnings - allowed_during_annual
     if non_allowed_monthly <= 0:
@@ -50,10 +66,9 @@ def apply_annual_leave_deduction(doc, method=None):
     amount = round(daily_non_allowed * custom_annual_leave_days, 2)
 
     # --- 5) Upsert the deduction row ----------------------------------------
-    target = DEDUCTION_COMPONENT.strip().lower()
     row = None
     for d in (doc.get("deductions") or []):
-        if (d.salary_component or "").strip().lower() == target:
+        if d.salary_component == DEDUCTION_COMPONENT:
             row = d
             break
 
@@ -77,6 +92,46 @@ def get_custom_annual_leave_days_from_leave_applications(employee, start_date, e
         fields=["from_date", "to_date", "half_day", "half_day_date"],
     )
 
+    return get_overlap_days(apps, start_date, end_date)
+
+
+def get_payroll_annual_leave_days(payroll_entry, start_date, end_date, leave_type):
+    """
+    {employee: overlapping days} for every employee of the Payroll Entry, loaded with one
+    query and kept for the rest of the request / job that creates the run's slips.
+    """
+    # frappe.flags is reset for every request / job
+    cache = frappe.flags.setdefault("payroll_annual_leave_days", {})
+    key = (payroll_entry, str(start_date), str(end_date), leave_type)
+    if key in cache:
+        return cache[key]
+
+    apps_by_employee = {}
+    for a in frappe.db.sql(
+        """
+        select la.employee, la.from_date, la.to_date, la.half_day, la.half_day_date
+        from `tabLeave Application` la
+        where la.status = 'Approved'
+            and la.leave_type = %(leave_type)s
+            and la.from_date <= %(end_date)s
+            and la.to_date >= %(start_date)s
+            and la.employee in (
+                select employee from `tabPayroll Employee Detail` where parent = %(payroll_entry)s
+            )
+        """,
+        {"payroll_entry": payroll_entry, "start_date": start_date, "end_date": end_date, "leave_type": leave_type},
+        as_dict=True,
+    ):
+        apps_by_employee.setdefault(a.employee, []).append(a)
+
+    cache[key] = {
+        employee: get_overlap_days(apps, start_date, end_date) for employee, apps in apps_by_employee.items()
+    }
+    return cache[key]
+
+
+def get_overlap_days(apps, start_date, end_date):
+    """Days of the leave applications falling within start_date..end_date, each application counted on its own."""
     if not apps:
         return 0.0
 
@@ -106,7 +161,44 @@ def get_custom_annual_leave_days_from_leave_applications(employee, start_date, e
 
 def zero_or_remove_deduction_row(doc):
     """If deduction row exists for our component, zero it (or remove if you prefer)."""
-    target = DEDUCTION_COMPONENT.strip().lower()
     for d in (doc.get("deductions") or []):
-        if (d.salary_component or "").strip().lower() == target:
-            d.amount = 0.0
\ No newline at end of file
+        if d.salary_component == DEDUCTION_COMPONENT:
+            d.amount = 0.0
+
+
+def get_component_flags():
+    """{salary_component: flags} for components with any flag set, read from the database only on a change."""
+    version = cint(frappe.safe_decode(frappe.cache.get(frappe.cache.make_key(FLAGS_VERSION_KEY))))
+
+    cached = _local_flags.get(frappe.local.site)
+    if cached and cached["version"] == version:
+        return cached["flags"]
+
+    cached = frappe.cache.get_value(FLAGS_KEY)
+    if not cached or cached["version"] != version:
+        flags = {
+            d.name: {"paid_during_annual_leave": cint(d.custom_paid_during_annual_leave)}
+            for d in frappe.get_all(
+                "Salary Component",
+                filters={"custom_paid_during_annual_leave": 1},
+                fields=["name", "custom_paid_during_annual_leave"],
+            )
+        }
+        cached = {"version": version, "flags": flags}
+        frappe.cache.set_value(FLAGS_KEY, cached)
+
+    _local_flags[frappe.local.site] = cached
+    return cached["flags"]
+
+
+def invalidate_component_flags(doc, method=None):
+    """doc_events hook for Salary Component."""
+    bump_flags_version()
+    # again after commit, so that a concurrent reader cannot cache the old flags under the new version
+    frappe.db.after_commit.add(bump_flags_version)
+
+
+def bump_flags_version():
+    frappe.cache.incr(frappe.cache.make_key(FLAGS_VERSION_KEY))
+    frappe.cache.delete_value(FLAGS_KEY)
+    _local_flags.pop(frappe.local.site, None)
\ No newline at end of file
@@ -8,6 +8,35 @@ from frappe import _
 @frappe.whitelist()
 def update_draft(salary_structure):
     if salary_structure:
-        frappe.db.sql(f""" update `tabSalary Structure` set docstatus = 0 where name = '{salary_structure}' and docstatus = 1 """)
-        frappe.db.sql(f""" update `tabSalary Detail` set docstatus = 0 where parent = '{salary_structure}' and docstatus = 1 """)
-        
+        update_drafts([salary_structure])
+
+
+@frappe.whitelist()
+def update_drafts(salary_structures):
+    """Revert submitted Salary Structures (and their Salary Details) to draft in one transaction."""
+    frappe.only_for("System Manager")
+
+    if isinstance(salary_structures, str):
+        salary_structures = frappe.parse_json(salary_structures)
+    names = list({d for d in salary_structures or [] if d})
+    if not names:
+        return []
+
+    names = frappe.get_all("Salary Structure", filters={"name": ("in", names), "docstatus": 1}, pluck="name")
+    if not names:
+        return []
+
+    frappe.db.sql(
+        """update `tabSalary Structure` set docstatus = 0 where name in %(names)s and docstatus = 1""",
+        {"names": names},
+    )
+    frappe.db.sql(
+        """update `tabSalary Detail` set docstatus = 0
+        where parent in %(names)s and parenttype = 'Salary Structure' and docstatus = 1""",
+        {"names": names},
+    )
+
+    for name in names:
+        frappe.clear_document_cache("Salary Structure", name)
+
+    return names
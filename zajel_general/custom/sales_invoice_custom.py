@@ -0,0 +1,12 @@
+from zajel_general.zajel_general.doctype.pos_sales_rollup.pos_sales_rollup import update_pos_sales_rollup
+from zajel_general.zajel_general.report.pos_trends.pos_trends_cache import invalidate_for_invoice
+
+
+def on_submit(doc, method=None):
+    update_pos_sales_rollup(doc, 1)
+    invalidate_for_invoice(doc)
+
+
+def on_cancel(doc, method=None):
+    update_pos_sales_rollup(doc, -1)
+    invalidate_for_invoice(doc)
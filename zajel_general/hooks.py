@@ -46,7 +46,7 @@ app_license = "mit"
 doctype_js = {
 	"Salary Structure" : "public/js/salary_structure_custom.js",
     }
-# doctype_list_js = {"doctype" : "public/js/doctype_list.js"}
+doctype_list_js = {"Salary Structure" : "public/js/salary_structure_list.js"}
 # doctype_tree_js = {"doctype" : "public/js/doctype_tree.js"}
 # doctype_calendar_js = {"doctype" : "public/js/doctype_calendar.js"}
 
@@ -86,6 +86,7 @@ doctype_js = {
 
 # before_install = "zajel_general.install.before_install"
 # after_install = "zajel_general.install.after_install"
+after_migrate = ["zajel_general.install.after_migrate"]
 
 # Uninstallation
 # ------------
@@ -152,9 +153,42 @@ doc_events = {
     "Material Request": {
         "validate": "zajel_general.custom.purchase_order_custom.validate"
     },
+    "Item": {
+        "on_update": "zajel_general.custom.item_rules_cache.invalidate_item_rules",
+        "after_rename": "zajel_general.custom.item_rules_cache.invalidate_item_rules",
+        "on_trash": "zajel_general.custom.item_rules_cache.invalidate_item_rules"
+    },
+    "UOM Conversion Detail": {
+        "on_update": "zajel_general.custom.item_rules_cache.invalidate_item_rules",
+        "on_trash": "zajel_general.custom.item_rules_cache.invalidate_item_rules"
+    },
+    "Item Supplier": {
+        "on_update": "zajel_general.custom.item_rules_cache.invalidate_item_rules",
+        "on_trash": "zajel_general.custom.item_rules_cache.invalidate_item_rules"
+    },
+    "Sales Invoice": {
+        "on_submit": "zajel_general.custom.sales_invoice_custom.on_submit",
+        "on_cancel": "zajel_general.custom.sales_invoice_custom.on_cancel"
+    },
+    "Period Closing Voucher": {
+        "on_submit": "zajel_general.custom.period_closing_custom.on_period_closing_submit",
+        "on_cancel": "zajel_general.custom.period_closing_custom.on_period_closing_cancel"
+    },
+    "GL Entry": {
+        "on_submit": "zajel_general.custom.period_closing_custom.on_gl_entry_submit"
+    },
+    "Account": {
+        "on_update": "zajel_general.custom.period_closing_custom.on_account_update",
+        "after_rename": "zajel_general.custom.period_closing_custom.clear_account_snapshots",
+        "on_trash": "zajel_general.custom.period_closing_custom.clear_account_snapshots"
+    },
     # "Salary Slip": {
     #     "validate": "zajel_general.custom.salary_slip_custom.apply_annual_leave_deduction"
     # },
+    "Salary Component": {
+        "on_update": "zajel_general.custom.salary_slip_custom.invalidate_component_flags",
+        "on_trash": "zajel_general.custom.salary_slip_custom.invalidate_component_flags"
+    },
 # 	"*": {
 # 		"on_update": "method",
 # 		"on_cancel": "method",
@@ -166,11 +200,11 @@ doc_events = {
 # ---------------
 
 scheduler_events = {
-# 	"all": [
-# 		"zajel_general.tasks.all"
-# 	],
+	"all": [
+		"zajel_general.task.expire_due_signatures",
+	],
 	"daily": [
-		"zajel_general.tasks.expire_old_signatures",
+		"zajel_general.task.expire_old_signatures",
 	],
 # 	"hourly": [
 # 		"zajel_general.tasks.hourly"
@@ -0,0 +1,90 @@
+import frappe
+from frappe.utils import add_months, nowdate
+
+# composite indexes for the report hot paths: doctype -> [(index name, columns)]
+INDEXES = {
+	"Sales Invoice": [
+		# POS Trends: filter on company/docstatus/posting_date, group by customer columns
+		(
+			"zajel_company_docstatus_posting_date",
+			("company", "docstatus", "posting_date", "customer", "customer_group", "territory"),
+		),
+	],
+	"Sales Invoice Item": [
+		# POS Trends: join on parent, group by item columns, sum qty/amount from the index
+		("zajel_parent_item_code", ("parent", "item_code", "item_group", "stock_qty", "base_net_amount")),
+	],
+	"POS Sales Rollup": [
+		("zajel_company_posting_date", ("company", "posting_date")),
+		("zajel_company_item_code", ("company", "item_code", "posting_date")),
+		("zajel_company_customer", ("company", "customer", "posting_date")),
+	],
+	"Certificate Request": [
+		# expire_old_signatures: approved, still showing the signature, validity passed
+		("zajel_status_show_signature_valid_till", ("status", "show_signature", "valid_till")),
+	],
+	"Kitchen Timing Aggregate": [
+		# Kitchen Performance: date range, then the histogram rows of each group
+		("zajel_date_metric", ("date", "metric", "bucket")),
+	],
+	"Kitchen Order Ticket": [
+		# allocate_tokens: last token of the shift when its counter is not cached
+		("zajel_pos_opening_shift_token_no", ("pos_opening_shift", "token_no")),
+	],
+}
+
+# one-row lookups joined on their primary key, a scan of these is not a problem
+SMALL_TABLE_ALIASES = ("t4",)
+
+
+def ensure_indexes():
+	for doctype, indexes in INDEXES.items():
+		if not frappe.db.table_exists(doctype):
+			continue
+
+		for index_name, columns in indexes:
+			frappe.db.add_index(doctype, list(columns), index_name)
+
+
+def get_report_queries(company):
+	"""(label, query, params) for every query shape POS Trends can generate."""
+	from zajel_general.zajel_general.report.pos_trends.pos_trends import (
+		get_columns,
+		get_grouped_query,
+		get_query,
+		get_query_params,
+	)
+
+	queries = []
+	for use_rollup in (0, 1):
+		for based_on in ("Item", "Item Group", "Customer"):
+			for group_by in ("", "Item", "Customer"):
+				if based_on == group_by:
+					continue
+
+				filters = frappe._dict(
+					company=company,
+					based_on=based_on,
+					group_by=group_by,
+					from_date=add_months(nowdate(), -12),
+					to_date=nowdate(),
+					use_rollup=use_rollup,
+				)
+				conditions = get_columns(filters, "Sales Invoice")
+				query = get_grouped_query(filters, conditions) if group_by else get_query(filters, conditions)
+				label = f"POS Trends based_on={based_on} group_by={group_by or '-'} rollup={use_rollup}"
+				queries.append((label, query, get_query_params(filters)))
+
+	return queries
+
+
+def check_report_query_plans(company=None):
+	"""EXPLAIN each generated report query, return a list of the full table scans found."""
+	company = company or frappe.db.get_value("Company", {}, "name")
+	failures = []
+	for label, query, params in get_report_queries(company):
+		for row in frappe.db.sql("explain " + query, params, as_dict=True):
+			if row.type == "ALL" and row.table not in SMALL_TABLE_ALIASES:
+				failures.append(f"{label}: full scan of {row.table} (~{row.rows} rows)")
+
+	return failures
@@ -0,0 +1,7 @@
+from zajel_general.indexes import ensure_indexes
+from zajel_general.task import queue_signature_expiries
+
+
+def after_migrate():
+	ensure_indexes()
+	queue_signature_expiries()
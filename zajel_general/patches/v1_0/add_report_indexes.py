@@ -0,0 +1,8 @@
+from zajel_general.indexes import ensure_indexes
+from zajel_general.zajel_general.report.pos_trends.pos_trends_cache import clear_cache
+
+
+def execute():
+	ensure_indexes()
+	# results cached before the indexes may come from differently ordered query plans
+	clear_cache()
@@ -0,0 +1,31 @@
+import frappe
+from frappe.modules.utils import sync_customizations
+
+# components that were hard-coded as fully paid during annual leave
+PAID_DURING_ANNUAL_LEAVE = (
+	"Basic Salary",
+	"Housing Allowance",
+	"Sales Commission",
+	"Arrear",
+	"Reimbursement",
+	"Advance Salary Paid",
+	"Overtime",
+	"Sales Tips",
+	"Bonus",
+	"Leave Encashment",
+)
+
+
+def execute():
+	# customizations are synced after the patches, the flag field is needed now
+	sync_customizations("zajel_general")
+
+	names = [
+		d.name
+		for d in frappe.get_all("Salary Component", fields=["name"])
+		if d.name.strip().lower() in {c.lower() for c in PAID_DURING_ANNUAL_LEAVE}
+	]
+	if names:
+		frappe.db.set_value(
+			"Salary Component", {"name": ("in", names)}, "custom_paid_during_annual_leave", 1, update_modified=False
+		)
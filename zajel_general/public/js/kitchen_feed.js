@@ -0,0 +1,118 @@
+frappe.provide("zajel_general");
+
+// Open Kitchen Order Tickets of a POS Profile, loaded once and kept current from realtime deltas.
+// Used by the Kitchen Display page, which loads this file with frappe.require.
+//
+//	const feed = new zajel_general.KitchenFeed({
+//		pos_profile: "Main Hall",
+//		on_change: (tickets) => render(tickets),
+//	});
+//	feed.start();
+zajel_general.KitchenFeed = class KitchenFeed {
+	constructor({ pos_profile, on_change }) {
+		this.pos_profile = pos_profile || "";
+		this.on_change = on_change || (() => {});
+		this.event = `kot_feed:${this.pos_profile}`;
+		this.open_statuses = ["todo", "inprogress", "completed"];
+		this.tickets = new Map();
+		this.handler = (message) => this.receive(message);
+		// the rooms are joined again after a reconnect
+		this.reload = () => {
+			this.subscribe();
+			this.load_snapshot();
+		};
+	}
+
+	start() {
+		this.subscribe();
+		frappe.realtime.on(this.event, this.handler);
+		// deltas missed while disconnected are recovered from a fresh snapshot
+		frappe.realtime.socket && frappe.realtime.socket.on("connect", this.reload);
+		return this.load_snapshot();
+	}
+
+	// a profile's deltas go to the POS Profile's document room, the others to the doctype room
+	subscribe() {
+		if (this.pos_profile) {
+			frappe.realtime.doc_subscribe("POS Profile", this.pos_profile);
+		} else {
+			frappe.realtime.doctype_subscribe("Kitchen Order Ticket");
+		}
+	}
+
+	unsubscribe() {
+		if (this.pos_profile) {
+			frappe.realtime.doc_unsubscribe("POS Profile", this.pos_profile);
+		} else {
+			frappe.realtime.doctype_unsubscribe("Kitchen Order Ticket");
+		}
+	}
+
+	stop() {
+		frappe.realtime.off(this.event, this.handler);
+		frappe.realtime.socket && frappe.realtime.socket.off("connect", this.reload);
+		this.unsubscribe();
+	}
+
+	load_snapshot() {
+		this.pending = [];
+		return frappe
+			.xcall("zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_feed.get_open_tickets", {
+				pos_profile: this.pos_profile,
+			})
+			.then((tickets) => {
+				this.tickets = new Map(tickets.map((ticket) => [ticket.name, ticket]));
+				const pending = this.pending;
+				this.pending = null;
+				pending.forEach((message) => this.apply(message));
+				this.on_change(this.get_tickets());
+			});
+	}
+
+	receive(message) {
+		// deltas arriving while the snapshot loads are applied on top of it
+		if (this.pending) {
+			this.pending.push(message);
+			return;
+		}
+		this.apply(message);
+		this.on_change(this.get_tickets());
+	}
+
+	apply(message) {
+		if (message.action === "remove") {
+			this.tickets.delete(message.name);
+			return;
+		}
+
+		const delta = message.ticket;
+		const ticket = this.tickets.get(delta.name);
+		if (ticket && ticket.modified > delta.modified) return;
+		if (!ticket && !delta.full) {
+			// a change to a ticket this screen never loaded, e.g. one reopened after delivery
+			if (!this.pending) this.load_snapshot();
+			return;
+		}
+
+		const { items, removed_items, full, ...fields } = delta;
+		const next = Object.assign(ticket || { items: [] }, fields);
+
+		const by_name = new Map(next.items.map((item) => [item.name, item]));
+		(items || []).forEach((item) => {
+			by_name.has(item.name) ? Object.assign(by_name.get(item.name), item) : next.items.push(item);
+		});
+		if (removed_items) {
+			next.items = next.items.filter((item) => !removed_items.includes(item.name));
+		}
+
+		if (this.open_statuses.includes(next.status)) {
+			this.tickets.set(next.name, next);
+		} else {
+			this.tickets.delete(next.name);
+		}
+	}
+
+	get_tickets() {
+		return Array.from(this.tickets.values());
+	}
+};
@@ -1,7 +1,5 @@
 frappe.ui.form.on("Salary Structure", {
 	refresh: function(frm) {
-        // alert(frappe.db.get_value("User",{"name":frappe.session.user},"name"))
-        console.log(frappe.user_roles.includes("System Manager"))
         if(frm.doc.docstatus === 1 && frappe.user_roles.includes("System Manager")) {
             frm.add_custom_button(__("Update to Draft"), function() {
                 frm.trigger('update_draft');
@@ -16,10 +14,9 @@ frappe.ui.form.on("Salary Structure", {
 				salary_structure: frm.doc.name
 			},
 			callback: function(r) {
-				frm.refresh();
-                window.location.reload();
+				frm.reload_doc();
 			}
 		});
 	},
 
-});
\ No newline at end of file
+});
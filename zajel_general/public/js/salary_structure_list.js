@@ -0,0 +1,28 @@
+frappe.listview_settings["Salary Structure"] = frappe.listview_settings["Salary Structure"] || {};
+
+const salary_structure_onload = frappe.listview_settings["Salary Structure"].onload;
+
+frappe.listview_settings["Salary Structure"].onload = function (listview) {
+	if (salary_structure_onload) salary_structure_onload(listview);
+	if (!frappe.user_roles.includes("System Manager")) return;
+
+	listview.page.add_actions_menu_item(__("Update to Draft"), () => {
+		const names = listview.get_checked_items(true);
+		if (!names.length) return;
+
+		frappe.confirm(__("Revert {0} Salary Structures to draft?", [names.length]), () => {
+			frappe.call({
+				method: "zajel_general.custom.salary_structure_custom.update_drafts",
+				args: { salary_structures: names },
+				freeze: true,
+				callback: (r) => {
+					frappe.show_alert({
+						message: __("{0} Salary Structures reverted to draft", [(r.message || []).length]),
+						indicator: "green",
+					});
+					listview.refresh();
+				},
+			});
+		});
+	});
+};
@@ -1,18 +1,105 @@
-# your_app/tasks.py
+import json
+import time
+
 import frappe
-from frappe.utils import nowdate, getdate
+from frappe.utils import add_days, get_datetime, getdate, now, now_datetime, nowdate
+
+# sorted set of Certificate Request names, scored by the time their signature expires
+SIGNATURE_EXPIRY_KEY = "zajel_general:signature_expiry"
+
 
 def expire_old_signatures():
-    rows = frappe.get_all(
-        "Certificate Request",
-        filters={"status": "Approved"},
-        fields=["name", "valid_till"]
+    """
+    Hide the signature on Approved certificates whose validity has passed.
+    Daily backstop for expire_due_signatures, in case a queued expiry was lost.
+    """
+    start = time.monotonic()
+    expired = expire_signatures()
+    result = {"expired": expired, "seconds": round(time.monotonic() - start, 3)}
+    frappe.logger("zajel_general").info(f"expire_old_signatures: {result}")
+    return result
+
+
+def expire_due_signatures():
+    """Scheduler tick: expire only the certificates whose queued expiry time has passed."""
+    key = frappe.cache.make_key(SIGNATURE_EXPIRY_KEY)
+    due = frappe.cache.zrangebyscore(key, "-inf", now_datetime().timestamp())
+    if not due:
+        return 0
+
+    # only the process that removes an entry expires it, concurrent ticks skip it
+    pipeline = frappe.cache.pipeline()
+    for name in due:
+        pipeline.zrem(key, name)
+    names = [name.decode() for name, removed in zip(due, pipeline.execute()) if removed]
+
+    return expire_signatures(names) if names else 0
+
+
+def expire_signatures(names=None):
+    """
+    Clear show_signature on expired Approved certificates (limited to `names` if given)
+    with one set-based update, and write their Version rows in bulk. Returns the row count.
+    """
+    filters = {"status": "Approved", "show_signature": 1, "valid_till": ("<", nowdate())}
+    if names is not None:
+        filters["name"] = ("in", names)
+
+    names = frappe.get_all("Certificate Request", filters=filters, pluck="name")
+    if names:
+        frappe.db.set_value("Certificate Request", {"name": ("in", names)}, "show_signature", 0)
+        add_versions(names, [["show_signature", 1, 0]])
+
+    return len(names)
+
+
+def add_versions(names, changed):
+    """Record the same field change on many Certificate Requests in one insert."""
+    timestamp, user = now(), frappe.session.user
+    data = json.dumps(
+        {"added": [], "changed": changed, "removed": [], "row_changed": [], "data_import": None},
+        separators=(",", ":"),
+    )
+    frappe.db.bulk_insert(
+        "Version",
+        ("name", "creation", "modified", "owner", "modified_by", "ref_doctype", "docname", "data"),
+        [
+            (frappe.generate_hash(), timestamp, timestamp, user, user, "Certificate Request", name, data)
+            for name in names
+        ],
     )
-    today = getdate(nowdate())
-    for r in rows:
-        if r.valid_till and getdate(r.valid_till) < today:
-            doc = frappe.get_doc("Certificate Request", r.name)
-            doc.show_signature = 0
-            # (Optional) flip to “Rejected” or “Expired” if you add such state
-            # doc.status = "Expired"
-            doc.save(ignore_permissions=True)
\ No newline at end of file
+
+
+def queue_signature_expiries():
+    """(Re)queue the expiry of every certificate currently showing its signature."""
+    expiries = {
+        d.name: get_expiry_timestamp(d.valid_till)
+        for d in frappe.get_all(
+            "Certificate Request",
+            filters={"status": "Approved", "show_signature": 1, "valid_till": ("is", "set")},
+            fields=["name", "valid_till"],
+        )
+    }
+    if expiries:
+        frappe.cache.zadd(frappe.cache.make_key(SIGNATURE_EXPIRY_KEY), expiries)
+
+
+def get_expiry_timestamp(valid_till):
+    # the signature shows through valid_till, it expires when the next day starts
+    return get_datetime(add_days(getdate(valid_till), 1)).timestamp()
+
+
+def schedule_signature_expiry(doc):
+    """Queue (or drop) the certificate's expiry once the transaction commits."""
+    name = doc.name
+    if doc.docstatus < 2 and doc.status == "Approved" and doc.show_signature and doc.valid_till:
+        expires_at = get_expiry_timestamp(doc.valid_till)
+        frappe.db.after_commit.add(
+            lambda: frappe.cache.zadd(frappe.cache.make_key(SIGNATURE_EXPIRY_KEY), {name: expires_at})
+        )
+    else:
+        unschedule_signature_expiry(name)
+
+
+def unschedule_signature_expiry(name):
+    frappe.db.after_commit.add(lambda: frappe.cache.zrem(frappe.cache.make_key(SIGNATURE_EXPIRY_KEY), name))
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+import frappe
+from frappe.utils import flt
+from redis import Redis
+
+
+class LRUCache:
+	"""Small size-bounded in-process cache, least recently used entries are evicted first."""
+
+	def __init__(self, maxsize=1024):
+		self.maxsize = maxsize
+		self._data = OrderedDict()
+
+	def __len__(self):
+		return len(self._data)
+
+	def get(self, key, default=None):
+		try:
+			self._data.move_to_end(key)
+		except KeyError:
+			return default
+		return self._data[key]
+
+	def set(self, key, value):
+		self._data[key] = value
+		self._data.move_to_end(key)
+		while len(self._data) > self.maxsize:
+			self._data.popitem(last=False)
+
+	def pop(self, key, default=None):
+		return self._data.pop(key, default)
+
+	def clear(self):
+		self._data.clear()
+
+
+def incr_counters(key, counts):
+	"""Add `counts` ({field: n}) to the site-wide redis counter hash `key`."""
+	counts = {field: n for field, n in counts.items() if n}
+	if not counts:
+		return
+
+	redis_key = frappe.cache.make_key(key)
+	pipe = frappe.cache.pipeline()
+	for field, n in counts.items():
+		if isinstance(n, float):
+			pipe.hincrbyfloat(redis_key, field, n)
+		else:
+			pipe.hincrby(redis_key, field, n)
+	pipe.execute()
+
+
+def get_counters(key):
+	"""Return the counter hash written by `incr_counters` as {field: number}."""
+	# RedisWrapper.hgetall unpickles values, counters are stored as plain numbers
+	values = Redis.hgetall(frappe.cache, frappe.cache.make_key(key))
+	out = {}
+	for field, value in values.items():
+		value = frappe.safe_decode(value)
+		try:
+			out[frappe.safe_decode(field)] = int(value)
+		except ValueError:
+			out[frappe.safe_decode(field)] = flt(value)
+	return out
+
+
+def reset_counters(key):
+	frappe.cache.delete_value(key)
@@ -5,6 +5,12 @@ import frappe
 from frappe.utils import add_days, now_datetime, getdate, nowdate
 from frappe.model.document import Document
 
+from zajel_general.task import schedule_signature_expiry, unschedule_signature_expiry
+
+
+# days a certificate stays signed after approval
+VALIDITY_DAYS = 10
+
 
 class CertificateRequest(Document):
 
@@ -12,28 +18,23 @@ class CertificateRequest(Document):
         """
         Keep derived fields consistent whenever the doc is saved.
         """
-        # Ensure default validity
-        # if not self.validity_days:
-        validity_days = 10
-        
-        """Auto-assign letterhead based on selected company in custom doctype"""
-
-        # Skip if letter_head is already set manually
-        if getattr(self, "letter_head", None):
-            return
+        self.set_letter_head()
+        self.set_approval()
 
-        # Ensure company exists
-        if not getattr(self, "company", None):
+    def set_letter_head(self):
+        """Auto-assign letterhead based on selected company, unless set manually"""
+        if self.letter_head or not self.company:
             return
 
-        # Fetch default letterhead for that company
-        default_letterhead = frappe.db.get_value("Company", self.company, "default_letter_head")
+        # Company is read from the document cache, which is cleared when the Company is saved
+        default_letterhead = frappe.get_cached_value("Company", self.company, "default_letter_head")
 
         if default_letterhead:
             self.letter_head = default_letterhead
         else:
             frappe.logger().info(f"No default letterhead found for {self.company}")
 
+    def set_approval(self):
         if self.status == "Approved":
             # Stamp approver/time once
             if not self.approved_on:
@@ -42,7 +43,7 @@ class CertificateRequest(Document):
                 self.approved_by = frappe.session.user
 
             # Compute validity window
-            self.valid_till = add_days(self.approved_on, validity_days)
+            self.valid_till = add_days(self.approved_on, VALIDITY_DAYS)
 
             # Still valid?
             self.show_signature = 1 if getdate(self.valid_till) >= getdate(nowdate()) else 0
@@ -54,4 +55,16 @@ class CertificateRequest(Document):
             if self.status in ("Draft", "Pending CEO Approval", "Rejected"):
                 self.approved_on = None
                 self.approved_by = None
-                self.valid_till = None
\ No newline at end of file
+                self.valid_till = None
+
+    def on_update(self):
+        schedule_signature_expiry(self)
+
+    def on_update_after_submit(self):
+        schedule_signature_expiry(self)
+
+    def on_cancel(self):
+        unschedule_signature_expiry(self.name)
+
+    def on_trash(self):
+        unschedule_signature_expiry(self.name)
@@ -0,0 +1,219 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import io
+import zipfile
+
+import frappe
+from frappe import _
+from frappe.model.workflow import apply_workflow, get_transitions, get_workflow, get_workflow_name
+from frappe.utils import cint
+from pypdf import PdfWriter
+
+# certificates rendered per background job
+CHUNK_SIZE = 20
+# rendered PDFs are cached per (certificate, modified), a changed certificate gets a new key
+PDF_CACHE_KEY = "zajel_general:certificate_pdf:{0}:{1}"
+PDF_CACHE_TTL = 7 * 24 * 60 * 60
+BATCH_KEY = "zajel_general:certificate_print_batch:{0}"
+
+
+@frappe.whitelist()
+def bulk_approve(names, render=1, output="PDF"):
+    """
+    Approve the given Certificate Requests in one transaction, each through its workflow's
+    approval transition, then render their PDFs in background jobs and send the user one
+    merged PDF (or ZIP) when all are done.
+    """
+    names = frappe.parse_json(names) if isinstance(names, str) else names
+    names = list(dict.fromkeys(names or []))
+    if not names:
+        return
+
+    if output not in ("PDF", "ZIP"):
+        frappe.throw(_("Unsupported output {0}").format(output))
+
+    if not get_workflow_name("Certificate Request"):
+        frappe.throw(_("Certificate Requests can only be approved through their workflow, which is not active"))
+
+    approved_states = get_approved_states()
+    for name in names:
+        doc = frappe.get_doc("Certificate Request", name)
+        if doc.status == "Approved":
+            continue
+
+        # only the transitions the user's roles allow from the doc's current state
+        action = next(
+            (t.action for t in get_transitions(doc) if t.next_state in approved_states),
+            None,
+        )
+        if not action:
+            frappe.throw(_("You cannot approve Certificate Request {0} from its state {1}").format(name, doc.status))
+
+        # an error on any certificate rolls back the whole batch with the request
+        apply_workflow(doc, action)
+
+    if cint(render):
+        enqueue_render(names, output)
+
+    return names
+
+
+def get_approved_states():
+    """Workflow states that set the Certificate Request status to Approved."""
+    workflow = get_workflow("Certificate Request")
+    return {
+        d.state
+        for d in workflow.states
+        if (workflow.workflow_state_field == "status" and d.state == "Approved")
+        or (d.update_field == "status" and d.update_value == "Approved")
+    }
+
+
+@frappe.whitelist()
+def enqueue_print(names, output="PDF"):
+    """Render already approved Certificate Requests into one merged PDF (or ZIP)."""
+    names = frappe.parse_json(names) if isinstance(names, str) else names
+    names = list(dict.fromkeys(names or []))
+    for name in names:
+        frappe.has_permission("Certificate Request", "print", name, throw=True)
+
+    if output not in ("PDF", "ZIP"):
+        frappe.throw(_("Unsupported output {0}").format(output))
+
+    enqueue_render(names, output)
+
+
+def enqueue_render(names, output):
+    batch_id = frappe.generate_hash(length=12)
+    chunks = [names[i : i + CHUNK_SIZE] for i in range(0, len(names), CHUNK_SIZE)]
+
+    frappe.cache.set_value(
+        BATCH_KEY.format(batch_id),
+        {"names": names, "output": output, "chunks": len(chunks)},
+        expires_in_sec=PDF_CACHE_TTL,
+    )
+    for chunk in chunks:
+        frappe.enqueue(
+            render_chunk,
+            queue="long",
+            timeout=1800,
+            enqueue_after_commit=True,
+            batch_id=batch_id,
+            names=chunk,
+            user=frappe.session.user,
+        )
+
+    frappe.msgprint(_("{0} certificates queued for printing, you will be notified when the file is ready.").format(len(names)))
+
+
+def render_chunk(batch_id, names, user):
+    batch_key = BATCH_KEY.format(batch_id)
+    failed = []
+    for name in names:
+        try:
+            get_certificate_pdf(name)
+        except Exception:
+            # one broken certificate should not hold back the rest of the batch
+            frappe.log_error(
+                title=_("Certificate Request {0} could not be printed").format(name),
+                reference_doctype="Certificate Request",
+                reference_name=name,
+            )
+            failed.append(name)
+
+    if failed:
+        frappe.cache.sadd(batch_key + ":failed", *failed)
+        frappe.cache.expire(frappe.cache.make_key(batch_key + ":failed"), PDF_CACHE_TTL)
+
+    # the job finishing the last chunk merges the batch
+    done_key = frappe.cache.make_key(batch_key + ":done")
+    done = frappe.cache.incr(done_key)
+    frappe.cache.expire(done_key, PDF_CACHE_TTL)
+    batch = frappe.cache.get_value(batch_key, expires=True)
+    if not (batch and done == batch["chunks"]):
+        return
+
+    failed = {frappe.safe_decode(name) for name in frappe.cache.smembers(batch_key + ":failed")}
+    try:
+        merge_batch(batch, user, failed)
+    except Exception:
+        # not raised, the job then commits the Error Logs of this chunk too
+        log = frappe.log_error(title=_("Certificate print batch {0} failed").format(batch_id))
+        error = _("see Error Log {0}").format(log.name) if log else _("see the Error Log")
+        publish_failure(user, batch, error, failed)
+
+
+def get_certificate_pdf(name):
+    """The certificate's PDF, rendered with its type's print format and its letterhead."""
+    modified, certificate_type, letter_head = frappe.db.get_value(
+        "Certificate Request", name, ["modified", "certificate_type", "letter_head"]
+    )
+    key = PDF_CACHE_KEY.format(name, modified)
+    pdf = frappe.cache.get_value(key, expires=True)
+    if pdf is None:
+        print_format = certificate_type if frappe.db.exists("Print Format", certificate_type) else None
+        pdf = frappe.get_print(
+            "Certificate Request",
+            name,
+            print_format,
+            as_pdf=True,
+            letterhead=letter_head,
+            no_letterhead=0 if letter_head else 1,
+        )
+        frappe.cache.set_value(key, pdf, expires_in_sec=PDF_CACHE_TTL)
+
+    return pdf
+
+
+def merge_batch(batch, user, failed=()):
+    names = [name for name in batch["names"] if name not in failed]
+    if not names:
+        publish_failure(user, batch, _("none of the certificates could be rendered"), failed)
+        return
+
+    if batch["output"] == "ZIP":
+        file_name = "certificates-{0}.zip".format(frappe.generate_hash(length=10))
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name in names:
+                archive.writestr(f"{name}.pdf", get_certificate_pdf(name))
+    else:
+        file_name = "certificates-{0}.pdf".format(frappe.generate_hash(length=10))
+        buffer = io.BytesIO()
+        writer = PdfWriter()
+        for name in names:
+            writer.append(io.BytesIO(get_certificate_pdf(name)))
+        writer.write(buffer)
+
+    file_doc = frappe.get_doc(
+        {
+            "doctype": "File",
+            "file_name": file_name,
+            "is_private": 1,
+            "content": buffer.getvalue(),
+        }
+    )
+    file_doc.flags.ignore_permissions = True
+    file_doc.insert()
+    frappe.db.commit()
+
+    frappe.publish_realtime(
+        "certificate_print_ready",
+        {
+            "file_url": file_doc.file_url,
+            "file_name": file_name,
+            "count": len(names),
+            # left out of the file, each has an Error Log
+            "failed": sorted(failed),
+        },
+        user=user,
+    )
+
+
+def publish_failure(user, batch, error, failed=()):
+    frappe.publish_realtime(
+        "certificate_print_ready",
+        {"error": error, "count": 0, "total": len(batch["names"]), "failed": sorted(failed)},
+        user=user,
+    )
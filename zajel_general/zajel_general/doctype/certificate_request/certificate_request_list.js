@@ -0,0 +1,49 @@
+frappe.listview_settings["Certificate Request"] = {
+    onload: function (listview) {
+        const method = "zajel_general.zajel_general.doctype.certificate_request.certificate_request_bulk";
+
+        listview.page.add_actions_menu_item(__("Approve and Print"), () => {
+            const names = listview.get_checked_items(true);
+            if (!names.length) return;
+
+            frappe.confirm(__("Approve and print {0} certificates?", [names.length]), () => {
+                frappe.call({
+                    method: `${method}.bulk_approve`,
+                    args: { names: names },
+                    freeze: true,
+                    callback: () => listview.refresh(),
+                });
+            });
+        });
+
+        listview.page.add_actions_menu_item(__("Print as ZIP"), () => {
+            const names = listview.get_checked_items(true);
+            if (!names.length) return;
+
+            frappe.call({ method: `${method}.enqueue_print`, args: { names: names, output: "ZIP" } });
+        });
+
+        frappe.realtime.off("certificate_print_ready");
+        frappe.realtime.on("certificate_print_ready", (data) => {
+            const failed = (data.failed || []).length
+                ? "<br>" + __("Could not be printed: {0}", [data.failed.join(", ")])
+                : "";
+
+            if (data.error) {
+                frappe.msgprint({
+                    title: __("Printing failed"),
+                    message: __("The certificates could not be printed, {0}", [data.error]) + failed,
+                    indicator: "red",
+                });
+                return;
+            }
+
+            frappe.msgprint(
+                __("{0} certificates are ready: {1}", [
+                    data.count,
+                    `<a href="${data.file_url}" target="_blank">${data.file_name}</a>`,
+                ]) + failed
+            );
+        });
+    },
+};
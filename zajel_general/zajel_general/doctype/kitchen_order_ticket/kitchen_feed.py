@@ -0,0 +1,115 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import frappe
+
+# kitchen screens load the open tickets once (get_open_tickets) and then apply the deltas
+# published on "kot_feed:<pos profile>" to the room of that POS Profile, so that a screen only
+# gets its own profile's traffic; tickets without a profile go to the Kitchen Order Ticket room
+FEED_EVENT = "kot_feed:{0}"
+OPEN_STATUSES = ("todo", "inprogress", "completed")
+
+TICKET_FIELDS = (
+	"status",
+	"kot_no",
+	"token_no",
+	"table_no",
+	"pos_profile",
+	"pos_opening_shift",
+	"sales_invoice",
+	"notes",
+)
+ITEM_FIELDS = ("item_code", "item_name", "qty", "uom", "remarks", "item_group", "station", "item_status")
+
+
+def get_feed_event(pos_profile):
+	return FEED_EVENT.format(pos_profile or "")
+
+
+def publish_ticket_update(doc):
+	"""Publish what changed on the ticket and its items since it was loaded, once committed."""
+	before = doc.get_doc_before_save()
+	delta = get_ticket_delta(doc, before)
+
+	if before and before.pos_profile != doc.pos_profile:
+		publish(before.pos_profile, {"action": "remove", "name": doc.name})
+		delta = get_ticket_delta(doc, None)
+
+	if delta:
+		publish(doc.pos_profile, {"action": "update", "ticket": delta})
+
+
+def publish_ticket_removed(doc):
+	publish(doc.pos_profile, {"action": "remove", "name": doc.name})
+
+
+def publish(pos_profile, message):
+	if pos_profile:
+		# the document room, joined by screens that can read the POS Profile
+		room = {"doctype": "POS Profile", "docname": pos_profile}
+	else:
+		room = {"doctype": "Kitchen Order Ticket"}
+
+	frappe.publish_realtime(get_feed_event(pos_profile), message, after_commit=True, **room)
+
+
+def get_ticket_delta(doc, before):
+	"""The whole ticket when new, else only the changed fields and items; None if nothing changed."""
+	delta = {"name": doc.name, "modified": str(doc.modified)}
+	if not before:
+		delta["full"] = 1
+		delta.update({f: doc.get(f) for f in TICKET_FIELDS})
+		delta["items"] = [get_item_values(d) for d in doc.items]
+		return delta
+
+	delta.update({f: doc.get(f) for f in TICKET_FIELDS if doc.get(f) != before.get(f)})
+
+	old_items = {d.name: d for d in before.items}
+	items = []
+	for d in doc.items:
+		old = old_items.pop(d.name, None)
+		changed = {f: d.get(f) for f in ITEM_FIELDS if not old or d.get(f) != old.get(f)}
+		if changed:
+			items.append({"name": d.name, **changed})
+
+	if items:
+		delta["items"] = items
+	if old_items:
+		delta["removed_items"] = list(old_items)
+
+	return delta if len(delta) > 2 else None
+
+
+def get_item_values(item):
+	return {"name": item.name, **{f: item.get(f) for f in ITEM_FIELDS}}
+
+
+@frappe.whitelist()
+def get_open_tickets(pos_profile=None):
+	"""Open tickets of the POS Profile (or without one) and their items, for a kitchen screen to start from."""
+	filters = {"status": ("in", OPEN_STATUSES), "pos_profile": pos_profile or ("is", "not set")}
+
+	tickets = frappe.get_list(
+		"Kitchen Order Ticket",
+		filters=filters,
+		fields=["name", "modified", *TICKET_FIELDS],
+		order_by="creation asc",
+		limit_page_length=0,
+	)
+	if not tickets:
+		return []
+
+	items = {}
+	for d in frappe.get_all(
+		"Kitchen Order Ticket Item",
+		filters={"parenttype": "Kitchen Order Ticket", "parent": ("in", [t.name for t in tickets])},
+		fields=["name", "parent", *ITEM_FIELDS],
+		order_by="idx asc",
+	):
+		items.setdefault(d.pop("parent"), []).append(d)
+
+	for ticket in tickets:
+		ticket.modified = str(ticket.modified)
+		ticket["items"] = items.get(ticket.name, [])
+
+	return tickets
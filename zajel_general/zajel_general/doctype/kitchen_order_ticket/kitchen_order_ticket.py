@@ -4,8 +4,34 @@
 import frappe
 from frappe.model.document import Document
 
+from zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_feed import (
+	publish_ticket_removed,
+	publish_ticket_update,
+)
+from zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_order_ticket_batch import (
+	allocate_tokens,
+	validate_ticket,
+)
+from zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_queue import (
+	dequeue_ticket_items,
+	queue_ticket_items,
+	record_ticket_timings,
+)
+
 
 class KitchenOrderTicket(Document):
+	def before_insert(self):
+		if not self.token_no:
+			allocate_tokens([self])
+
 	def validate(self):
-		if not self.items or len(self.items) == 0:
-			frappe.throw("KOT must have at least one item")
+		validate_ticket(self)
+
+	def on_update(self):
+		record_ticket_timings(self)
+		queue_ticket_items(self)
+		publish_ticket_update(self)
+
+	def on_trash(self):
+		dequeue_ticket_items(self)
+		publish_ticket_removed(self)
@@ -0,0 +1,277 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import cint, now
+
+from zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_feed import get_ticket_delta, publish
+from zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_queue import queue_ticket_items, route_items
+
+# last token number handed out per POS Opening Shift
+TOKEN_KEY = "zajel_general:kot_token:{0}"
+TOKEN_TTL = 7 * 24 * 60 * 60
+
+TICKET_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"idx",
+	"status",
+	"company",
+	"pos_profile",
+	"table_no",
+	"token_no",
+	"pos_opening_shift",
+	"sales_invoice",
+	"notes",
+)
+ITEM_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"parent",
+	"parenttype",
+	"parentfield",
+	"idx",
+	"item_code",
+	"item_name",
+	"item_group",
+	"station",
+	"qty",
+	"uom",
+	"remarks",
+	"item_status",
+)
+
+
+def get_ticket_name(sales_invoice):
+	# the first name the "KOT - {sales_invoice} - {####}" series gives, so that a retry maps to the same ticket
+	return f"KOT - {sales_invoice} - 0001"
+
+
+@frappe.whitelist()
+def create_kitchen_order_tickets(tickets):
+	"""
+	Create one Kitchen Order Ticket per Sales Invoice for a batch of tickets, in one transaction.
+	`tickets` is a list of {sales_invoice, pos_opening_shift, table_no, notes, items}; the company,
+	POS profile and (when not given) the items come from the Sales Invoice. Invoices that already
+	have a ticket are not ticketed again. Returns [{sales_invoice, name, token_no}].
+
+	The tickets are bulk inserted: KitchenOrderTicket.validate runs on each (validate_ticket), but
+	the standard document checks (links, mandatory fields, doc_events hooks of other apps) and
+	the controller's other events do not; their effects (token, queues, feed) are applied here.
+	"""
+	frappe.has_permission("Kitchen Order Ticket", "create", throw=True)
+
+	tickets = frappe.parse_json(tickets) if isinstance(tickets, str) else tickets
+	tickets = {d["sales_invoice"]: frappe._dict(d) for d in tickets or [] if d.get("sales_invoice")}
+	if not tickets:
+		return []
+
+	existing = {
+		d.sales_invoice: d
+		for d in frappe.get_all(
+			"Kitchen Order Ticket",
+			filters={"sales_invoice": ("in", list(tickets))},
+			fields=["name", "sales_invoice", "token_no"],
+			# the invoice's first ticket wins
+			order_by="creation desc",
+		)
+	}
+	new_tickets = [ticket for sales_invoice, ticket in tickets.items() if sales_invoice not in existing]
+	if new_tickets:
+		insert_tickets(new_tickets)
+
+	created = {
+		d.sales_invoice: d
+		for d in frappe.get_all(
+			"Kitchen Order Ticket",
+			filters={"name": ("in", [get_ticket_name(t.sales_invoice) for t in new_tickets] or [""])},
+			fields=["name", "sales_invoice", "token_no"],
+		)
+	}
+	return [
+		{"sales_invoice": si, "name": d.name, "token_no": d.token_no}
+		for si in tickets
+		if (d := existing.get(si) or created.get(si))
+	]
+
+
+def insert_tickets(tickets):
+	set_invoice_details(tickets)
+
+	docs = []
+	for ticket in tickets:
+		name = get_ticket_name(ticket.sales_invoice)
+		items = [
+			frappe._dict(d, name=f"{name} - {idx:03d}", idx=idx, qty=cint(d.get("qty")), item_status="todo")
+			for idx, d in enumerate(ticket.get("items") or [], 1)
+		]
+		doc = frappe._dict(ticket, name=name, items=items)
+		validate_ticket(doc)
+		docs.append(doc)
+
+	allocate_tokens(docs)
+
+	timestamp, user = now(), frappe.session.user
+	ticket_values = []
+	for doc in docs:
+		doc.modified = timestamp
+		ticket_values.append(
+			(
+				doc.name,
+				timestamp,
+				timestamp,
+				user,
+				user,
+				0,
+				0,
+				doc.status,
+				doc.company,
+				doc.pos_profile,
+				doc.get("table_no"),
+				doc.token_no,
+				doc.get("pos_opening_shift"),
+				doc.sales_invoice,
+				doc.get("notes"),
+			)
+		)
+
+	# a concurrent retry of the same invoice inserts the same names, the duplicate is skipped
+	frappe.db.bulk_insert("Kitchen Order Ticket", TICKET_FIELDS, ticket_values, ignore_duplicates=True)
+
+	# tokens are unique, a ticket stored with another token was inserted by that retry, which
+	# adds its items, queues and publishes it itself
+	stored_tokens = dict(
+		frappe.get_all(
+			"Kitchen Order Ticket",
+			filters={"name": ("in", [doc.name for doc in docs])},
+			fields=["name", "token_no"],
+			as_list=True,
+		)
+	)
+	docs = [doc for doc in docs if cint(stored_tokens.get(doc.name)) == cint(doc.token_no)]
+	if not docs:
+		return
+
+	frappe.db.bulk_insert(
+		"Kitchen Order Ticket Item",
+		ITEM_FIELDS,
+		[
+			(
+				item.name,
+				timestamp,
+				timestamp,
+				user,
+				user,
+				0,
+				doc.name,
+				"Kitchen Order Ticket",
+				"items",
+				item.idx,
+				item.get("item_code"),
+				item.get("item_name"),
+				item.get("item_group"),
+				item.station,
+				item.qty,
+				item.get("uom"),
+				item.get("remarks"),
+				item.item_status,
+			)
+			for doc in docs
+			for item in doc.items
+		],
+	)
+	set_series(docs)
+
+	for doc in docs:
+		queue_ticket_items(doc)
+		publish(doc.pos_profile, {"action": "update", "ticket": get_ticket_delta(doc, None)})
+
+
+def validate_ticket(doc):
+	"""What KitchenOrderTicket.validate checks and sets, for documents and batch tickets alike."""
+	if not doc.items:
+		if doc.get("sales_invoice"):
+			frappe.throw(_("KOT for {0} must have at least one item").format(doc.sales_invoice))
+		frappe.throw(_("KOT must have at least one item"))
+
+	route_items(doc)
+
+
+def set_invoice_details(tickets):
+	"""Company, POS Profile and missing items of the tickets from their Sales Invoices, in two queries."""
+	invoices = {
+		d.name: d
+		for d in frappe.get_all(
+			"Sales Invoice",
+			filters={"name": ("in", [t.sales_invoice for t in tickets])},
+			fields=["name", "company", "pos_profile"],
+		)
+	}
+
+	without_items = [t.sales_invoice for t in tickets if not t.get("items")]
+	invoice_items = {}
+	if without_items:
+		for d in frappe.get_all(
+			"Sales Invoice Item",
+			filters={"parenttype": "Sales Invoice", "parent": ("in", without_items)},
+			fields=["parent", "item_code", "item_name", "item_group", "qty", "uom"],
+			order_by="idx asc",
+		):
+			invoice_items.setdefault(d.pop("parent"), []).append(d)
+
+	for ticket in tickets:
+		invoice = invoices.get(ticket.sales_invoice)
+		if not invoice:
+			frappe.throw(_("Sales Invoice {0} not found").format(ticket.sales_invoice))
+
+		ticket.company = invoice.company
+		ticket.pos_profile = ticket.get("pos_profile") or invoice.pos_profile
+		if not ticket.get("items"):
+			ticket["items"] = invoice_items.get(ticket.sales_invoice, [])
+
+
+def allocate_tokens(tickets):
+	"""Token numbers from an atomic per POS Opening Shift counter, one INCRBY per shift."""
+	by_shift = {}
+	for ticket in tickets:
+		by_shift.setdefault(ticket.get("pos_opening_shift") or "", []).append(ticket)
+
+	for shift, shift_tickets in by_shift.items():
+		key = frappe.cache.make_key(TOKEN_KEY.format(shift))
+		# RedisWrapper.exists prefixes the key itself
+		if not frappe.cache.exists(TOKEN_KEY.format(shift)):
+			# continue after the tokens already given in this shift
+			last = frappe.db.sql(
+				"""select ifnull(max(token_no), 0) from `tabKitchen Order Ticket` where {0}""".format(
+					"pos_opening_shift = %(shift)s"
+					if shift
+					else "(pos_opening_shift is null or pos_opening_shift = '')"
+				),
+				{"shift": shift},
+			)[0][0]
+			frappe.cache.set(key, cint(last), nx=True, ex=TOKEN_TTL)
+
+		last = frappe.cache.incrby(key, len(shift_tickets))
+		for token, ticket in enumerate(shift_tickets, last - len(shift_tickets) + 1):
+			ticket.token_no = token
+
+
+def set_series(tickets):
+	"""Move each invoice's naming series past the ticket inserted here, for tickets made the usual way later."""
+	values = [(f"KOT - {t.sales_invoice} - ", 1) for t in tickets]
+	frappe.db.sql(
+		"""insert into `tabSeries` (name, current) values {0}
+		on duplicate key update current = greatest(current, values(current))""".format(
+			", ".join(["(%s, %s)"] * len(values))
+		),
+		[v for row in values for v in row],
+	)
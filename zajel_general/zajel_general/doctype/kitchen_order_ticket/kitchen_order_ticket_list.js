@@ -1,13 +1,15 @@
 frappe.listview_settings['Kitchen Order Ticket'] = {
     get_indicator: function(doc) {
         const colors = {
-            "Pending": "orange",
-            "Accepted": "blue",
-            "Preparing": "purple",
-            "Ready": "green",
-            "Served": "gray",
-            "Cancelled": "red"
+            "todo": "orange",
+            "inprogress": "blue",
+            "completed": "green",
+            "delivered": "gray"
         };
-        return [doc.status, colors[doc.status] || "blue", "status,=," + doc.status];
+        return [__(doc.status), colors[doc.status] || "blue", "status,=," + doc.status];
+    },
+    onload: function(listview) {
+        // kitchen screens use the Kitchen Display page, kept current by the realtime kitchen feed
+        listview.page.add_inner_button(__("Kitchen Display"), () => frappe.set_route("kitchen-display"));
     }
-};
\ No newline at end of file
+};
@@ -0,0 +1,340 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, get_datetime, now, now_datetime, time_diff_in_seconds
+
+from zajel_general.utils import get_counters, incr_counters
+from zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_feed import publish
+from zajel_general.zajel_general.doctype.kitchen_station.kitchen_station import (
+	get_queue_priorities,
+	get_queue_priority,
+	get_station,
+	get_station_map,
+)
+from zajel_general.zajel_general.doctype.kitchen_timing_aggregate.kitchen_timing_aggregate import record_timings
+
+# every station has a sorted set of its "todo" Kitchen Order Ticket Items, scored by the
+# priority of their item group and then the time they were queued, so that claiming the
+# next one is a single ZPOPMIN
+QUEUE_KEY = "zajel_general:kitchen_queue:{0}"
+# one priority step outweighs any queueing time (timestamps are ~2e9 seconds)
+PRIORITY_WEIGHT = 10**10
+# per ticket, the number of its items in each status; the ticket status is derived from it
+STATUS_COUNTS_KEY = "zajel_general:kot_status_counts:{0}"
+STATUS_COUNTS_TTL = 2 * 24 * 60 * 60
+
+ITEM_STATUSES = ("todo", "inprogress", "completed", "delivered")
+# item field stamped when the item reaches a status
+STATUS_TIMESTAMPS = {"inprogress": "started_at", "completed": "completed_at", "delivered": "delivered_at"}
+
+
+def route_items(doc):
+	"""Set the station of every item from its item group, default the item status and roll it up to the ticket."""
+	station_map = get_station_map()
+	for item in doc.items:
+		if not item.station:
+			item.station = get_station(item.item_group, station_map)
+		if not item.item_status:
+			item.item_status = "todo"
+		set_status_timestamps(item, item.item_status)
+
+	doc.status = get_ticket_status(get_item_status_counts(doc.items))
+
+
+def queue_ticket_items(doc):
+	"""Queue the ticket's "todo" items on their stations and reset its status counts, once committed."""
+	queued_at = now_datetime().timestamp()
+	priorities = get_queue_priorities()
+	queued, done = {}, []
+	for item in doc.items:
+		if not item.station:
+			continue
+		if item.item_status == "todo":
+			queued.setdefault(item.station, {})[item.name] = get_queue_score(
+				item.item_group, queued_at + item.idx / 1000, priorities
+			)
+		else:
+			done.append((item.station, item.name))
+
+	counts = get_item_status_counts(doc.items)
+
+	def update():
+		pipe = frappe.cache.pipeline()
+		for station, items in queued.items():
+			# items already queued keep their place
+			pipe.zadd(frappe.cache.make_key(QUEUE_KEY.format(station)), items, nx=True)
+		for station, item_name in done:
+			pipe.zrem(frappe.cache.make_key(QUEUE_KEY.format(station)), item_name)
+		pipe.delete(frappe.cache.make_key(STATUS_COUNTS_KEY.format(doc.name)))
+		pipe.execute()
+		set_status_counts(doc.name, counts)
+
+	frappe.db.after_commit.add(update)
+
+
+def dequeue_ticket_items(doc):
+	def update():
+		pipe = frappe.cache.pipeline()
+		for item in doc.items:
+			if item.station:
+				pipe.zrem(frappe.cache.make_key(QUEUE_KEY.format(item.station)), item.name)
+		pipe.delete(frappe.cache.make_key(STATUS_COUNTS_KEY.format(doc.name)))
+		pipe.execute()
+
+	frappe.db.after_commit.add(update)
+
+
+def get_queue_score(item_group, queued_at, priorities=None):
+	return get_queue_priority(item_group, priorities) * PRIORITY_WEIGHT + queued_at
+
+
+def get_item_status_counts(items):
+	counts = dict.fromkeys(ITEM_STATUSES, 0)
+	for item in items:
+		counts[item.item_status or "todo"] += 1
+	return counts
+
+
+def set_status_counts(ticket, counts):
+	key = STATUS_COUNTS_KEY.format(ticket)
+	incr_counters(key, counts)
+	frappe.cache.expire(frappe.cache.make_key(key), STATUS_COUNTS_TTL)
+
+
+def get_status_counts(ticket):
+	"""Item count per status of the ticket, read from the database only if not cached."""
+	counts = get_counters(STATUS_COUNTS_KEY.format(ticket))
+	if not counts:
+		counts = dict.fromkeys(ITEM_STATUSES, 0)
+		for status, count in frappe.db.sql(
+			"""select ifnull(item_status, ''), count(*) from `tabKitchen Order Ticket Item`
+			where parent = %s and parenttype = 'Kitchen Order Ticket' group by item_status""",
+			ticket,
+		):
+			counts[status or "todo"] += count
+		set_status_counts(ticket, counts)
+
+	return counts
+
+
+def get_ticket_status(counts):
+	total = sum(counts.values())
+	if not total or counts.get("todo", 0) == total:
+		return "todo"
+	if counts.get("delivered", 0) == total:
+		return "delivered"
+	if counts.get("completed", 0) + counts.get("delivered", 0) == total:
+		return "completed"
+	return "inprogress"
+
+
+def set_item_status(item_name, status):
+	"""Move one item to `status` and roll the change up to its ticket, without reading the other items."""
+	if status not in ITEM_STATUSES:
+		frappe.throw(_("Invalid item status {0}").format(status))
+
+	parent = frappe.db.get_value("Kitchen Order Ticket Item", item_name, "parent")
+	if not parent:
+		frappe.throw(_("Kitchen Order Ticket Item {0} not found").format(item_name))
+
+	frappe.has_permission("Kitchen Order Ticket", "write", throw=True)
+	# the ticket row lock makes status changes of the ticket's items (and its counts) go one at a time
+	ticket = frappe.db.get_value(
+		"Kitchen Order Ticket",
+		parent,
+		["name", "docstatus", "status", "pos_profile", "pos_opening_shift"],
+		as_dict=True,
+		for_update=True,
+	)
+	if ticket.docstatus == 2:
+		frappe.throw(_("Kitchen Order Ticket {0} is cancelled").format(ticket.name))
+
+	item = frappe.db.get_value(
+		"Kitchen Order Ticket Item",
+		item_name,
+		["name", "parent", "item_status", "station", "item_group", "creation", *STATUS_TIMESTAMPS.values()],
+		as_dict=True,
+	)
+
+	old_status = item.item_status or "todo"
+	if old_status == status:
+		return item
+
+	# seeds the counts from the items if they are not cached
+	get_status_counts(ticket.name)
+	timestamps = set_status_timestamps(item, status)
+	frappe.db.set_value(
+		"Kitchen Order Ticket Item", item_name, {"item_status": status, **timestamps}, update_modified=False
+	)
+	record_timings(get_transition_samples(item, old_status, status, ticket.pos_opening_shift))
+
+	delta = {old_status: -1, status: 1}
+	counts = incr_status_counts(ticket.name, delta)
+	# the counters are outside the transaction, undo them if it does not commit
+	frappe.db.after_rollback.add(lambda: incr_status_counts(ticket.name, {k: -v for k, v in delta.items()}))
+
+	queue_key = frappe.cache.make_key(QUEUE_KEY.format(item.station)) if item.station else None
+	if queue_key and status == "todo":
+		score = get_queue_score(item.item_group, now_datetime().timestamp())
+		frappe.db.after_commit.add(lambda: frappe.cache.zadd(queue_key, {item_name: score}))
+	elif queue_key and old_status == "todo":
+		frappe.db.after_commit.add(lambda: frappe.cache.zrem(queue_key, item_name))
+
+	ticket_status = get_ticket_status(counts)
+	modified = now()
+	frappe.db.set_value(
+		"Kitchen Order Ticket", ticket.name, {"status": ticket_status, "modified": modified}, update_modified=False
+	)
+
+	publish(
+		ticket.pos_profile,
+		{
+			"action": "update",
+			"ticket": {
+				"name": ticket.name,
+				"modified": modified,
+				"status": ticket_status,
+				"items": [{"name": item_name, "item_status": status}],
+			},
+		},
+	)
+	item.item_status = status
+	item.ticket_status = ticket_status
+	return item
+
+
+def incr_status_counts(ticket, delta):
+	"""Apply `delta` to the ticket's status counts, return all of them as they are right after it."""
+	key = frappe.cache.make_key(STATUS_COUNTS_KEY.format(ticket))
+	pipe = frappe.cache.pipeline()
+	for status, n in delta.items():
+		pipe.hincrby(key, status, n)
+	# in the same MULTI as the increments, so no other change gets in between
+	pipe.hgetall(key)
+	pipe.expire(key, STATUS_COUNTS_TTL)
+	counts = pipe.execute()[-2]
+
+	counts = {frappe.safe_decode(status): cint(n) for status, n in counts.items()}
+	if any(n < 0 for n in counts.values()):
+		# the counters drifted (e.g. a worker died between increment and commit), count the items again
+		frappe.cache.delete(key)
+		counts = get_status_counts(ticket)
+
+	return counts
+
+
+def set_status_timestamps(item, status):
+	"""Stamp the time the item reached `status` (and the statuses it skipped), return the fields set."""
+	timestamps, timestamp = {}, now()
+	for step in ITEM_STATUSES[1 : ITEM_STATUSES.index(status) + 1] if status in ITEM_STATUSES else []:
+		field = STATUS_TIMESTAMPS[step]
+		if not item.get(field):
+			item[field] = timestamps[field] = timestamp
+	return timestamps
+
+
+def get_transition_samples(item, old_status, status, pos_opening_shift):
+	# a jump from todo straight to delivered records both samples
+	samples = []
+	if old_status in ITEM_STATUSES and status in ITEM_STATUSES:
+		for step in ITEM_STATUSES[ITEM_STATUSES.index(old_status) + 1 : ITEM_STATUSES.index(status) + 1]:
+			samples += get_timing_samples(item, step, pos_opening_shift)
+	return samples
+
+
+def get_timing_samples(item, status, pos_opening_shift):
+	"""Prep (queued to completed) and delivery (completed to delivered) samples for record_timings."""
+	samples = []
+	if status == "completed" and item.creation and item.completed_at:
+		seconds = time_diff_in_seconds(get_datetime(item.completed_at), get_datetime(item.creation))
+		samples.append(("prep", item.completed_at, seconds, item.station, item.item_group, pos_opening_shift))
+	if status == "delivered" and item.completed_at and item.delivered_at:
+		seconds = time_diff_in_seconds(get_datetime(item.delivered_at), get_datetime(item.completed_at))
+		samples.append(("delivery", item.delivered_at, seconds, item.station, item.item_group, pos_opening_shift))
+	return samples
+
+
+def record_ticket_timings(doc):
+	"""Timing samples for the items whose status was changed by saving the ticket itself."""
+	before = doc.get_doc_before_save()
+	old_status = {d.name: d.item_status for d in before.items} if before else {}
+
+	samples = []
+	for item in doc.items:
+		previous = old_status.get(item.name) or "todo"
+		if item.item_status != previous:
+			samples += get_transition_samples(item, previous, item.item_status, doc.pos_opening_shift)
+
+	record_timings(samples)
+
+
+@frappe.whitelist()
+def claim_next_item(station):
+	"""Take the oldest queued item of the station and mark it in progress, None if the queue is empty."""
+	queue_key = frappe.cache.make_key(QUEUE_KEY.format(station))
+	while popped := frappe.cache.zpopmin(queue_key):
+		item_name = frappe.safe_decode(popped[0][0])
+		current = frappe.db.sql(
+			"""select item.item_status, ticket.docstatus
+			from `tabKitchen Order Ticket Item` item, `tabKitchen Order Ticket` ticket
+			where item.name = %s and ticket.name = item.parent""",
+			item_name,
+			as_dict=True,
+		)
+		# skip items deleted, moved on or cancelled since they were queued
+		if not current or current[0].item_status != "todo" or current[0].docstatus == 2:
+			continue
+
+		item = set_item_status(item_name, "inprogress")
+		# the item was claimable, put it back in its place if the claim does not commit
+		score = flt(popped[0][1])
+		frappe.db.after_rollback.add(lambda: frappe.cache.zadd(queue_key, {item_name: score}))
+		return item
+
+
+@frappe.whitelist()
+def complete_item(item):
+	return set_item_status(item, "completed")
+
+
+@frappe.whitelist()
+def deliver_item(item):
+	return set_item_status(item, "delivered")
+
+
+@frappe.whitelist()
+def get_queue_length(station):
+	return cint(frappe.cache.zcard(frappe.cache.make_key(QUEUE_KEY.format(station))))
+
+
+@frappe.whitelist()
+def make_kitchen_order_ticket(sales_invoice):
+	"""Create a Kitchen Order Ticket for the Sales Invoice, its items routed to their stations."""
+	si = frappe.get_doc("Sales Invoice", sales_invoice)
+	si.check_permission("read")
+
+	kot = frappe.new_doc("Kitchen Order Ticket")
+	kot.update(
+		{
+			"company": si.company,
+			"pos_profile": si.get("pos_profile"),
+			"sales_invoice": si.name,
+			"status": "todo",
+		}
+	)
+	for d in si.items:
+		kot.append(
+			"items",
+			{
+				"item_code": d.item_code,
+				"item_name": d.item_name,
+				"item_group": d.item_group,
+				"qty": cint(d.qty),
+				"uom": d.uom,
+			},
+		)
+
+	kot.insert()
+	return kot.name
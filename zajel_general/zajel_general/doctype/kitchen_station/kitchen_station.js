@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Hussain and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Kitchen Station", {
+// 	refresh(frm) {
+
+// 	},
+// });
@@ -0,0 +1,86 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import cint
+
+STATION_MAP_KEY = "zajel_general:kitchen_station_map"
+QUEUE_PRIORITY_KEY = "zajel_general:kitchen_queue_priority"
+
+
+class KitchenStation(Document):
+	def validate(self):
+		item_groups = [d.item_group for d in self.item_groups]
+		taken = frappe.get_all(
+			"Kitchen Station Item Group",
+			filters={"parenttype": "Kitchen Station", "parent": ("!=", self.name), "item_group": ("in", item_groups)},
+			fields=["item_group", "parent"],
+		)
+		for d in taken:
+			frappe.throw(_("Item Group {0} is already routed to Kitchen Station {1}").format(d.item_group, d.parent))
+
+	def on_update(self):
+		clear_station_map()
+
+	def on_trash(self):
+		clear_station_map()
+
+
+def get_station_map():
+	"""{item_group: station} for the enabled stations."""
+
+	def generator():
+		return dict(
+			frappe.db.sql(
+				"""select ig.item_group, ks.name
+				from `tabKitchen Station Item Group` ig, `tabKitchen Station` ks
+				where ig.parent = ks.name and ig.parenttype = 'Kitchen Station' and ks.disabled = 0"""
+			)
+		)
+
+	return frappe.cache.get_value(STATION_MAP_KEY, generator)
+
+
+def get_queue_priorities():
+	"""{item_group: priority} of the item groups routed to enabled stations, lower is claimed first."""
+
+	def generator():
+		return dict(
+			frappe.db.sql(
+				"""select ig.item_group, ig.priority
+				from `tabKitchen Station Item Group` ig, `tabKitchen Station` ks
+				where ig.parent = ks.name and ig.parenttype = 'Kitchen Station' and ks.disabled = 0"""
+			)
+		)
+
+	return frappe.cache.get_value(QUEUE_PRIORITY_KEY, generator)
+
+
+def get_station(item_group, station_map=None):
+	"""Station of the item group, or of its nearest parent group that has one."""
+	station_map = get_station_map() if station_map is None else station_map
+	return get_group_value(item_group, station_map)
+
+
+def get_queue_priority(item_group, priorities=None):
+	"""Queue priority of the item group, from the same (nearest parent) group its station comes from."""
+	priorities = get_queue_priorities() if priorities is None else priorities
+	return cint(get_group_value(item_group, priorities))
+
+
+def get_group_value(item_group, values):
+	while item_group:
+		if item_group in values:
+			return values[item_group]
+		item_group = frappe.get_cached_value("Item Group", item_group, "parent_item_group")
+
+
+def clear_station_map():
+	def clear():
+		frappe.cache.delete_value(STATION_MAP_KEY)
+		frappe.cache.delete_value(QUEUE_PRIORITY_KEY)
+
+	clear()
+	frappe.db.after_commit.add(clear)
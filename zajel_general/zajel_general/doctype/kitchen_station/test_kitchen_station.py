@@ -0,0 +1,163 @@
+# Copyright (c) 2026, Hussain and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_queue import (
+	QUEUE_KEY,
+	STATUS_COUNTS_KEY,
+	claim_next_item,
+	complete_item,
+	deliver_item,
+	get_status_counts,
+)
+from zajel_general.zajel_general.doctype.kitchen_station.kitchen_station import get_station
+
+STATION = "_Test Kitchen Station"
+# routed to the station, the urgent group is claimed first
+GROUP = "_Test Kitchen Group"
+URGENT_GROUP = "_Test Kitchen Urgent Group"
+CHILD_GROUP = "_Test Kitchen Child Group"
+
+
+class TestKitchenStation(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		make_item_group(GROUP, is_group=1)
+		make_item_group(URGENT_GROUP)
+		make_item_group(CHILD_GROUP, parent=GROUP)
+		if not frappe.db.exists("Kitchen Station", STATION):
+			frappe.get_doc(
+				{
+					"doctype": "Kitchen Station",
+					"station_name": STATION,
+					"item_groups": [
+						{"item_group": GROUP, "priority": 5},
+						{"item_group": URGENT_GROUP, "priority": 1},
+					],
+				}
+			).insert()
+
+	def setUp(self):
+		frappe.cache.delete_value(QUEUE_KEY.format(STATION))
+		# callbacks left by earlier tests, whose data is rolled back with the class
+		frappe.db.after_commit.reset()
+		frappe.db.after_rollback.reset()
+
+	def test_routing(self):
+		self.assertEqual(get_station(GROUP), STATION)
+		# a sub group goes to its parent's station
+		self.assertEqual(get_station(CHILD_GROUP), STATION)
+		self.assertIsNone(get_station("_Test Item Group"))
+
+		ticket = make_ticket([CHILD_GROUP, "_Test Item Group"])
+		self.assertEqual([d.station for d in ticket.items], [STATION, None])
+		self.assertEqual([d.item_status for d in ticket.items], ["todo", "todo"])
+		self.assertEqual(get_queue(), [ticket.items[0].name])
+
+	def test_claim_by_priority(self):
+		ticket = make_ticket([GROUP, URGENT_GROUP, GROUP])
+		items = [d.name for d in ticket.items]
+		self.assertEqual(get_queue(), [items[1], items[0], items[2]])
+
+		self.assertEqual(claim_next_item(STATION).name, items[1])
+		self.assertEqual(claim_next_item(STATION).name, items[0])
+		self.assertEqual(get_queue(), [items[2]])
+
+	def test_claim_complete_deliver(self):
+		ticket = make_ticket([GROUP, GROUP])
+		first, second = (d.name for d in ticket.items)
+
+		item = claim_next_item(STATION)
+		self.assertEqual(item.name, first)
+		self.assertEqual(item.item_status, "inprogress")
+		self.assertTicket(ticket.name, "inprogress", {"todo": 1, "inprogress": 1})
+		self.assertEqual(get_queue(), [second])
+
+		complete_item(first)
+		self.assertTicket(ticket.name, "inprogress", {"todo": 1, "completed": 1})
+
+		self.assertEqual(claim_next_item(STATION).name, second)
+		self.assertEqual(get_queue(), [])
+		self.assertIsNone(claim_next_item(STATION))
+
+		complete_item(second)
+		self.assertTicket(ticket.name, "completed", {"completed": 2})
+
+		deliver_item(first)
+		self.assertTicket(ticket.name, "completed", {"completed": 1, "delivered": 1})
+		deliver_item(second)
+		self.assertTicket(ticket.name, "delivered", {"delivered": 2})
+
+		for name in (first, second):
+			started_at, completed_at, delivered_at = frappe.db.get_value(
+				"Kitchen Order Ticket Item", name, ["started_at", "completed_at", "delivered_at"]
+			)
+			self.assertTrue(started_at <= completed_at <= delivered_at)
+
+	def test_claim_rollback(self):
+		ticket = make_ticket([GROUP, GROUP])
+		first, second = (d.name for d in ticket.items)
+		scores = get_queue(withscores=True)
+
+		frappe.db.savepoint("claim")
+		self.assertEqual(claim_next_item(STATION).name, first)
+		self.assertEqual(get_queue(), [second])
+		self.assertEqual(get_status_counts(ticket.name)["inprogress"], 1)
+
+		# what a failed request does: roll back, then run the rollback callbacks
+		frappe.db.rollback(save_point="claim")
+		frappe.db.after_commit.reset()
+		frappe.db.after_rollback.run()
+
+		self.assertEqual(get_queue(withscores=True), scores)
+		self.assertTicket(ticket.name, "todo", {"todo": 2})
+
+	def test_skip_stale_queue_entries(self):
+		ticket = make_ticket([GROUP, GROUP])
+		first, second = (d.name for d in ticket.items)
+		# moved on without going through the queue
+		frappe.db.set_value("Kitchen Order Ticket Item", first, "item_status", "completed")
+
+		self.assertEqual(claim_next_item(STATION).name, second)
+		self.assertEqual(get_queue(), [])
+
+	def assertTicket(self, ticket, status, counts):
+		expected = {"todo": 0, "inprogress": 0, "completed": 0, "delivered": 0, **counts}
+		self.assertEqual(frappe.db.get_value("Kitchen Order Ticket", ticket, "status"), status)
+		self.assertEqual(get_status_counts(ticket), expected)
+		# the cached counts agree with the items
+		frappe.cache.delete_value(STATUS_COUNTS_KEY.format(ticket))
+		self.assertEqual(get_status_counts(ticket), expected)
+
+
+def make_item_group(name, parent="All Item Groups", is_group=0):
+	if not frappe.db.exists("Item Group", name):
+		frappe.get_doc(
+			{"doctype": "Item Group", "item_group_name": name, "parent_item_group": parent, "is_group": is_group}
+		).insert()
+
+
+def make_ticket(item_groups):
+	ticket = frappe.get_doc(
+		{
+			"doctype": "Kitchen Order Ticket",
+			"company": "_Test Company",
+			"items": [
+				{"item_code": "_Test Item", "item_name": "_Test Item", "item_group": item_group, "qty": 1}
+				for item_group in item_groups
+			],
+		}
+	).insert()
+	# the queue and the status counts are updated once the ticket commits
+	frappe.db.after_commit.run()
+	return ticket
+
+
+def get_queue(withscores=False):
+	queue = frappe.cache.zrange(frappe.cache.make_key(QUEUE_KEY.format(STATION)), 0, -1, withscores=withscores)
+	if withscores:
+		return [(frappe.safe_decode(name), score) for name, score in queue]
+	return [frappe.safe_decode(name) for name in queue]
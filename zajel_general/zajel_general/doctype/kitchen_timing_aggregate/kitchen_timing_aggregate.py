@@ -0,0 +1,114 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import hashlib
+from bisect import bisect_left
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import get_datetime, now
+
+# upper bounds (seconds) of the histogram buckets, the last one takes everything longer
+BUCKETS = (
+	15, 30, 45, 60, 90, 120, 150, 180, 240, 300, 360, 420, 480, 600, 720, 900,
+	1200, 1500, 1800, 2400, 3000, 3600, 5400, 7200, 10800, 86400,
+)
+
+AGGREGATE_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"idx",
+	"date",
+	"hour",
+	"station",
+	"item_group",
+	"pos_opening_shift",
+	"metric",
+	"bucket",
+	"sample_count",
+	"total_seconds",
+)
+
+
+class KitchenTimingAggregate(Document):
+	pass
+
+
+def get_bucket(seconds):
+	return BUCKETS[min(bisect_left(BUCKETS, seconds), len(BUCKETS) - 1)]
+
+
+def record_timings(samples):
+	"""
+	Add timing samples to the histogram, one upsert for all of them.
+	`samples` are (metric, ended at, seconds, station, item_group, pos_opening_shift).
+	"""
+	rows = {}
+	for metric, ended_at, seconds, station, item_group, pos_opening_shift in samples:
+		if seconds is None or seconds < 0:
+			continue
+
+		ended_at = get_datetime(ended_at)
+		key = (
+			ended_at.date(),
+			ended_at.hour,
+			station or None,
+			item_group or None,
+			pos_opening_shift or None,
+			metric,
+			get_bucket(seconds),
+		)
+		row = rows.setdefault(key, [0, 0.0])
+		row[0] += 1
+		row[1] += seconds
+
+	if not rows:
+		return
+
+	timestamp, user = now(), frappe.session.user
+	values = [
+		(get_aggregate_name(key), timestamp, timestamp, user, user, 0, 0, *key, count, total)
+		for key, (count, total) in rows.items()
+	]
+	placeholders = ", ".join(["(" + ", ".join(["%s"] * len(AGGREGATE_FIELDS)) + ")"] * len(values))
+	frappe.db.sql(
+		f"""
+		insert into `tabKitchen Timing Aggregate` ({", ".join(f"`{f}`" for f in AGGREGATE_FIELDS)})
+		values {placeholders}
+		on duplicate key update
+			sample_count = sample_count + values(sample_count),
+			total_seconds = total_seconds + values(total_seconds),
+			modified = values(modified)
+		""",
+		[v for row in values for v in row],
+	)
+
+
+def get_aggregate_name(key):
+	return hashlib.md5("\x1f".join(str(v or "") for v in key).encode()).hexdigest()
+
+
+def get_percentile(histogram, percentile):
+	"""
+	Percentile (0-100) of a {bucket: count} histogram, interpolated linearly inside the bucket
+	it falls in.
+	"""
+	total = sum(histogram.values())
+	if not total:
+		return None
+
+	rank = total * percentile / 100
+	seen = 0
+	for bucket in sorted(histogram):
+		count = histogram[bucket]
+		if count and seen + count >= rank:
+			index = BUCKETS.index(bucket) if bucket in BUCKETS else 0
+			lower = BUCKETS[index - 1] if index else 0
+			return lower + (bucket - lower) * (rank - seen) / count
+		seen += count
+
+	return max(histogram)
@@ -0,0 +1,90 @@
+# Copyright (c) 2026, Hussain and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from zajel_general.zajel_general.doctype.kitchen_timing_aggregate.kitchen_timing_aggregate import (
+	BUCKETS,
+	get_bucket,
+	get_percentile,
+	record_timings,
+)
+
+STATION = "_Test Timing Station"
+ITEM_GROUP = "_Test Item Group"
+
+
+class TestKitchenTimingAggregate(FrappeTestCase):
+	def setUp(self):
+		frappe.db.delete("Kitchen Timing Aggregate", {"station": STATION})
+
+	def test_get_bucket(self):
+		self.assertEqual(get_bucket(0), 15)
+		# bucket bounds are inclusive
+		self.assertEqual(get_bucket(15), 15)
+		self.assertEqual(get_bucket(15.5), 30)
+		self.assertEqual(get_bucket(600), 600)
+		# the last bucket is open ended
+		self.assertEqual(get_bucket(BUCKETS[-1]), BUCKETS[-1])
+		self.assertEqual(get_bucket(BUCKETS[-1] * 10), BUCKETS[-1])
+
+	def test_record_timings(self):
+		record_timings(
+			[
+				("prep", "2020-01-01 10:05:00", 10, STATION, ITEM_GROUP, None),
+				("prep", "2020-01-01 10:35:00", 14, STATION, ITEM_GROUP, None),
+				("prep", "2020-01-01 10:50:00", 50, STATION, ITEM_GROUP, None),
+				("prep", "2020-01-01 11:00:00", 100000, STATION, ITEM_GROUP, None),
+				("delivery", "2020-01-01 10:10:00", 20, STATION, ITEM_GROUP, None),
+				# dropped, not a duration
+				("prep", "2020-01-01 10:10:00", -1, STATION, ITEM_GROUP, None),
+				("prep", "2020-01-01 10:10:00", None, STATION, ITEM_GROUP, None),
+			]
+		)
+		self.assertEqual(
+			get_rows(),
+			[
+				(10, "delivery", 30, 1, 20.0),
+				(10, "prep", 15, 2, 24.0),
+				(10, "prep", 60, 1, 50.0),
+				(11, "prep", BUCKETS[-1], 1, 100000.0),
+			],
+		)
+
+		# a later sample of the same hour and bucket adds to its row
+		record_timings([("prep", "2020-01-01 10:59:00", 12, STATION, ITEM_GROUP, None)])
+		self.assertIn((10, "prep", 15, 3, 36.0), get_rows())
+		self.assertEqual(len(get_rows()), 4)
+
+	def test_percentiles(self):
+		samples = [10] * 50 + [50] * 40 + [500] * 9 + [100000]
+		record_timings([("prep", "2020-01-02 10:00:00", s, STATION, ITEM_GROUP, None) for s in samples])
+
+		histogram = {bucket: count for _hour, _metric, bucket, count, _total in get_rows()}
+		self.assertEqual(histogram, {15: 50, 60: 40, 600: 9, BUCKETS[-1]: 1})
+
+		# interpolated inside the bucket the rank falls in: (45, 60] holds ranks 51 to 90
+		self.assertEqual(get_percentile(histogram, 50), 15)
+		self.assertEqual(get_percentile(histogram, 70), 52.5)
+		self.assertEqual(get_percentile(histogram, 90), 60)
+		self.assertEqual(get_percentile(histogram, 99), 600)
+		# the open ended last bucket is spread from the bucket before it up to its bound
+		self.assertEqual(get_percentile(histogram, 99.5), 10800 + (BUCKETS[-1] - 10800) / 2)
+		self.assertEqual(get_percentile(histogram, 100), BUCKETS[-1])
+
+	def test_percentile_of_empty_histogram(self):
+		self.assertIsNone(get_percentile({}, 50))
+		self.assertIsNone(get_percentile({15: 0}, 50))
+
+
+def get_rows():
+	return [
+		(d.hour, d.metric, d.bucket, d.sample_count, d.total_seconds)
+		for d in frappe.get_all(
+			"Kitchen Timing Aggregate",
+			filters={"station": STATION},
+			fields=["hour", "metric", "bucket", "sample_count", "total_seconds"],
+			order_by="hour asc, metric asc, bucket asc",
+		)
+	]
@@ -0,0 +1,213 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, flt, get_last_day, getdate, now
+
+from zajel_general.zajel_general.report.pos_trends.pos_trends_cache import clear_cache
+
+# a rollup row is unique on (company, posting_date, item_code, item_group, customer,
+# customer_group, territory); its name is a hash of those values, these are their
+# Sales Invoice columns
+KEY_SOURCE_FIELDS = (
+	"t1.company",
+	"t1.posting_date",
+	"t2.item_code",
+	"t2.item_group",
+	"t1.customer",
+	"t1.customer_group",
+	"t1.territory",
+)
+
+ROLLUP_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"idx",
+	"company",
+	"posting_date",
+	"item_code",
+	"item_name",
+	"item_group",
+	"customer",
+	"customer_name",
+	"customer_group",
+	"territory",
+	"stock_qty",
+	"base_net_amount",
+	"invoice_count",
+)
+
+
+class POSSalesRollup(Document):
+	pass
+
+
+def get_rollup_name(key):
+	return hashlib.md5("\x1f".join(str(v or "") for v in key).encode()).hexdigest()
+
+
+def update_pos_sales_rollup(sales_invoice, sign=1):
+	"""Add (sign=1, on submit) or remove (sign=-1, on cancel) a Sales Invoice from the rollup."""
+	rows = {}
+	for item in sales_invoice.items:
+		key = (
+			sales_invoice.company,
+			getdate(sales_invoice.posting_date),
+			item.item_code or None,
+			item.item_group or None,
+			sales_invoice.customer or None,
+			sales_invoice.customer_group or None,
+			sales_invoice.territory or None,
+		)
+		row = rows.get(key)
+		if not row:
+			row = rows[key] = {
+				"item_name": item.item_name,
+				"customer_name": sales_invoice.customer_name,
+				"stock_qty": 0.0,
+				"base_net_amount": 0.0,
+			}
+		row["stock_qty"] += flt(item.stock_qty)
+		row["base_net_amount"] += flt(item.base_net_amount)
+
+	if not rows:
+		return
+
+	timestamp, user = now(), frappe.session.user
+	values = []
+	for key, row in rows.items():
+		values.append(
+			(
+				get_rollup_name(key),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				0,
+				0,
+				key[0],
+				key[1],
+				key[2],
+				row["item_name"],
+				key[3],
+				key[4],
+				row["customer_name"],
+				key[5],
+				key[6],
+				sign * row["stock_qty"],
+				sign * row["base_net_amount"],
+				sign,
+			)
+		)
+
+	placeholders = ", ".join(["(" + ", ".join(["%s"] * len(ROLLUP_FIELDS)) + ")"] * len(values))
+	frappe.db.sql(
+		f"""
+		insert into `tabPOS Sales Rollup` ({", ".join(f"`{f}`" for f in ROLLUP_FIELDS)})
+		values {placeholders}
+		on duplicate key update
+			stock_qty = stock_qty + values(stock_qty),
+			base_net_amount = base_net_amount + values(base_net_amount),
+			invoice_count = invoice_count + values(invoice_count),
+			modified = values(modified),
+			modified_by = values(modified_by)
+		""",
+		[v for row in values for v in row],
+	)
+
+	if sign < 0:
+		frappe.db.sql(
+			"""delete from `tabPOS Sales Rollup` where name in %(names)s and invoice_count <= 0""",
+			{"names": [row[0] for row in values]},
+		)
+
+
+def rebuild_pos_sales_rollup(company=None, from_date=None, to_date=None, commit=False):
+	"""
+	Recompute the rollup from submitted Sales Invoices, one month at a time, then drop the
+	cached POS Trends results of the company, which may have been computed from the old rows.
+	Returns the number of rollup rows written.
+	"""
+	if not (from_date and to_date):
+		first, last = frappe.db.sql(
+			"""select min(posting_date), max(posting_date) from `tabSales Invoice`
+			where docstatus = 1 and (%(company)s is null or company = %(company)s)""",
+			{"company": company},
+		)[0]
+		if not first:
+			return 0
+		from_date, to_date = from_date or first, to_date or last
+
+	from_date, to_date = getdate(from_date), getdate(to_date)
+	count = 0
+	while from_date <= to_date:
+		chunk_end = min(getdate(get_last_day(from_date)), to_date)
+		count += rebuild_chunk(company, from_date, chunk_end)
+		if commit:
+			frappe.db.commit()
+		from_date = add_days(chunk_end, 1)
+
+	clear_cache(company)
+	# again after commit, in case a report cached the old rows meanwhile
+	frappe.db.after_commit.add(lambda: clear_cache(company))
+	return count
+
+
+def rebuild_chunk(company, from_date, to_date):
+	params = {"company": company, "from_date": from_date, "to_date": to_date, "user": frappe.session.user}
+	company_cond = "and company = %(company)s" if company else ""
+	source_company_cond = "and t1.company = %(company)s" if company else ""
+
+	frappe.db.sql(
+		f"""delete from `tabPOS Sales Rollup`
+		where posting_date between %(from_date)s and %(to_date)s {company_cond}""",
+		params,
+	)
+
+	key = ", ".join(f"ifnull({field}, '')" for field in KEY_SOURCE_FIELDS)
+	frappe.db.sql(
+		f"""
+		insert into `tabPOS Sales Rollup` ({", ".join(f"`{f}`" for f in ROLLUP_FIELDS)})
+		select
+			md5(concat_ws(char(31), {key})), now(), now(), %(user)s, %(user)s, 0, 0,
+			t1.company, t1.posting_date,
+			nullif(ifnull(t2.item_code, ''), ''), max(t2.item_name), nullif(ifnull(t2.item_group, ''), ''),
+			nullif(ifnull(t1.customer, ''), ''), max(t1.customer_name),
+			nullif(ifnull(t1.customer_group, ''), ''), nullif(ifnull(t1.territory, ''), ''),
+			ifnull(sum(t2.stock_qty), 0), ifnull(sum(t2.base_net_amount), 0), count(distinct t1.name)
+		from `tabSales Invoice` t1, `tabSales Invoice Item` t2
+		where t2.parent = t1.name
+			and t1.docstatus = 1
+			and t1.posting_date between %(from_date)s and %(to_date)s
+			{source_company_cond}
+		group by {key}
+		""",
+		params,
+	)
+
+	return frappe.db.sql(
+		f"""select count(*) from `tabPOS Sales Rollup`
+		where posting_date between %(from_date)s and %(to_date)s {company_cond}""",
+		params,
+	)[0][0]
+
+
+@frappe.whitelist()
+def enqueue_rebuild(company=None, from_date=None, to_date=None):
+	frappe.only_for("System Manager")
+	frappe.enqueue(
+		rebuild_pos_sales_rollup,
+		queue="long",
+		timeout=7200,
+		company=company,
+		from_date=from_date,
+		to_date=to_date,
+		commit=True,
+	)
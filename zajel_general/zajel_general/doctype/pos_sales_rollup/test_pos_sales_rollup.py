@@ -0,0 +1,120 @@
+# Copyright (c) 2026, Hussain and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt, getdate
+
+from erpnext.accounts.doctype.pos_profile.test_pos_profile import make_pos_profile
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+
+from zajel_general.zajel_general.doctype.pos_sales_rollup.pos_sales_rollup import (
+	get_rollup_name,
+	rebuild_pos_sales_rollup,
+)
+
+
+class TestPOSSalesRollup(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		make_pos_profile()
+
+	def test_submit_and_cancel(self):
+		first = make_pos_invoice(qty=2)
+		key = get_key(first)
+		self.assertRollupMatchesInvoices(key)
+
+		second = make_pos_invoice(qty=3)
+		self.assertEqual(get_key(second), key)
+		self.assertRollupMatchesInvoices(key)
+
+		second.cancel()
+		self.assertRollupMatchesInvoices(key)
+
+	def test_cancel_of_last_invoice_removes_row(self):
+		invoice = make_pos_invoice(qty=1, customer="_Test Customer 1")
+		key = get_key(invoice)
+		self.assertRollupMatchesInvoices(key)
+
+		# any other submitted invoice on the key keeps the row
+		others = get_invoice_totals(key)["invoice_count"] - 1
+		invoice.cancel()
+		if not others:
+			self.assertFalse(frappe.db.exists("POS Sales Rollup", get_rollup_name(key)))
+		self.assertRollupMatchesInvoices(key)
+
+	def test_rebuild_matches_incremental(self):
+		invoice = make_pos_invoice(qty=4)
+		key = get_key(invoice)
+		incremental = get_rollup(key)
+
+		rebuild_pos_sales_rollup(invoice.company, invoice.posting_date, invoice.posting_date)
+
+		self.assertEqual(get_rollup(key), incremental)
+		self.assertRollupMatchesInvoices(key)
+
+	def assertRollupMatchesInvoices(self, key):
+		expected = get_invoice_totals(key)
+		row = get_rollup(key)
+		if not expected["invoice_count"]:
+			self.assertIsNone(row)
+			return
+
+		self.assertEqual(row, expected)
+
+
+def make_pos_invoice(qty, customer="_Test Customer"):
+	invoice = create_sales_invoice(qty=qty, rate=100, customer=customer, do_not_save=True)
+	invoice.is_pos = 1
+	invoice.pos_profile = "_Test POS Profile"
+	invoice.append("payments", {"mode_of_payment": "Cash", "account": "Cash - _TC", "amount": qty * 100})
+	invoice.insert()
+	invoice.submit()
+	return invoice
+
+
+def get_key(invoice):
+	item = invoice.items[0]
+	return (
+		invoice.company,
+		getdate(invoice.posting_date),
+		item.item_code,
+		item.item_group,
+		invoice.customer,
+		invoice.customer_group,
+		invoice.territory,
+	)
+
+
+def get_rollup(key):
+	row = frappe.db.get_value(
+		"POS Sales Rollup", get_rollup_name(key), ["stock_qty", "base_net_amount", "invoice_count"], as_dict=True
+	)
+	return get_totals(row) if row else None
+
+
+def get_invoice_totals(key):
+	"""The rollup figures of the key, aggregated from the submitted Sales Invoices."""
+	company, posting_date, item_code, item_group, customer, customer_group, territory = key
+	row = frappe.db.sql(
+		"""
+		select sum(t2.stock_qty) as stock_qty, sum(t2.base_net_amount) as base_net_amount,
+			count(distinct t1.name) as invoice_count
+		from `tabSales Invoice` t1, `tabSales Invoice Item` t2
+		where t2.parent = t1.name and t1.docstatus = 1
+			and t1.company = %s and t1.posting_date = %s and t2.item_code = %s and t2.item_group = %s
+			and t1.customer = %s and t1.customer_group = %s and t1.territory = %s
+		""",
+		(company, posting_date, item_code, item_group, customer, customer_group, territory),
+		as_dict=True,
+	)[0]
+	return get_totals(row)
+
+
+def get_totals(row):
+	return {
+		"stock_qty": flt(row.stock_qty, 6),
+		"base_net_amount": flt(row.base_net_amount, 6),
+		"invoice_count": int(row.invoice_count or 0),
+	}
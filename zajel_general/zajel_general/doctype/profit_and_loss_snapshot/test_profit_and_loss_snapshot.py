@@ -0,0 +1,149 @@
+# Copyright (c) 2026, Hussain and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_years, flt, nowdate
+
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.report.financial_statements import get_period_list
+from erpnext.accounts.utils import get_fiscal_year
+
+from zajel_general.zajel_general.report.profit_and_loss_tabrah.period_snapshots import (
+	CLOSED_TILL_KEY,
+	build_snapshots,
+	clear_closed_till,
+	delete_snapshots,
+	get_filters_key,
+)
+from zajel_general.zajel_general.report.profit_and_loss_tabrah.profit_and_loss_tabrah import execute
+
+COMPANY = "_Test Company"
+
+
+class TestProfitandLossSnapshot(FrappeTestCase):
+	def setUp(self):
+		# last fiscal year, closed up to its end date
+		self.fiscal_year, self.year_start, self.year_end = get_fiscal_year(
+			add_years(nowdate(), -1), company=COMPANY
+		)
+		frappe.cache.hset(CLOSED_TILL_KEY, COMPANY, str(self.year_end))
+		delete_snapshots(COMPANY)
+
+		make_journal_entry("_Test Bank - _TC", "Sales - _TC", 500, posting_date=self.year_start, submit=True)
+		make_journal_entry(
+			"_Test Account Cost for Goods Sold - _TC",
+			"_Test Bank - _TC",
+			200,
+			posting_date=self.year_end,
+			submit=True,
+		)
+
+	def tearDown(self):
+		clear_closed_till(COMPANY)
+		frappe.db.rollback()
+
+	def test_snapshots_match_live_figures(self):
+		for accumulated_values in (0, 1):
+			live_filters = self.get_filters(use_period_snapshots=0, accumulated_values=accumulated_values)
+			live = execute(live_filters)
+
+			filters = self.get_filters(use_period_snapshots=1, accumulated_values=accumulated_values)
+			self.build_snapshots(filters)
+			self.assertTrue(self.get_snapshot_count(filters))
+
+			with_snapshots = execute(filters)
+			periods = self.get_periods(filters)
+			self.assertEqual(get_figures(with_snapshots, periods), get_figures(live, periods))
+			# report summary: income, expense and net profit
+			self.assertEqual([d.get("value") for d in with_snapshots[4]], [d.get("value") for d in live[4]])
+
+	def test_build_snapshots_rechecks_closed_periods(self):
+		filters = self.get_filters()
+
+		# the periods were reopened after the job was queued
+		frappe.cache.hset(CLOSED_TILL_KEY, COMPANY, str(add_years(self.year_start, -1)))
+		self.build_snapshots(filters)
+		self.assertFalse(self.get_snapshot_count(filters))
+
+		frappe.cache.hset(CLOSED_TILL_KEY, COMPANY, str(self.year_end))
+		self.build_snapshots(filters)
+		count = self.get_snapshot_count(filters)
+		self.assertTrue(count)
+
+		# a second job for the same periods finds them snapshotted
+		self.build_snapshots(filters)
+		self.assertEqual(self.get_snapshot_count(filters), count)
+
+	def test_gl_entry_in_closed_period_deletes_snapshots(self):
+		filters = self.get_filters()
+		self.build_snapshots(filters)
+		self.assertTrue(self.get_snapshot_count(filters, self.year_start))
+
+		make_journal_entry("_Test Bank - _TC", "Sales - _TC", 50, posting_date=self.year_start, submit=True)
+
+		self.assertFalse(self.get_snapshot_count(filters, self.year_start))
+		self.assertTrue(self.get_snapshot_count(filters, self.year_end))
+
+	def test_account_change_deletes_snapshots(self):
+		filters = self.get_filters()
+		self.build_snapshots(filters)
+		self.assertTrue(self.get_snapshot_count(filters))
+
+		account = frappe.get_doc("Account", "Sales - _TC")
+		account.include_in_gross = not account.include_in_gross
+		account.save()
+
+		self.assertFalse(self.get_snapshot_count(filters))
+
+	def get_filters(self, **kwargs):
+		filters = frappe._dict(
+			company=COMPANY,
+			from_fiscal_year=self.fiscal_year,
+			to_fiscal_year=self.fiscal_year,
+			period_start_date=self.year_start,
+			period_end_date=self.year_end,
+			filter_based_on="Fiscal Year",
+			periodicity="Monthly",
+			accumulated_values=0,
+			selected_view="Report",
+			include_default_book_entries=1,
+			use_period_snapshots=1,
+		)
+		filters.update(kwargs)
+		return filters
+
+	def get_periods(self, filters):
+		return get_period_list(
+			filters.from_fiscal_year,
+			filters.to_fiscal_year,
+			filters.period_start_date,
+			filters.period_end_date,
+			filters.filter_based_on,
+			filters.periodicity,
+			company=filters.company,
+		)
+
+	def build_snapshots(self, filters):
+		# what the job queued by the report does
+		periods = self.get_periods(filters)
+		build_snapshots(COMPANY, "Income", "Credit", filters, periods)
+		build_snapshots(COMPANY, "Expense", "Debit", filters, periods)
+
+	def get_snapshot_count(self, filters, posting_date=None):
+		conditions = {"company": COMPANY, "filters_key": get_filters_key(filters)}
+		if posting_date:
+			conditions.update({"from_date": ("<=", posting_date), "to_date": (">=", posting_date)})
+		return frappe.db.count("Profit and Loss Snapshot", conditions)
+
+
+def get_figures(result, period_list):
+	"""Account, per-period values and total of every row of an `execute` result."""
+	return [
+		(
+			row.get("account"),
+			*(flt(row.get(period.key), 3) for period in period_list),
+			flt(row.get("total"), 3),
+		)
+		for row in result[1]
+	]
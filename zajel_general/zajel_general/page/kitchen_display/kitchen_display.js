@@ -0,0 +1,165 @@
+// Copyright (c) 2026, Hussain and contributors
+// For license information, please see license.txt
+
+frappe.pages["kitchen-display"].on_page_load = function (wrapper) {
+	const page = frappe.ui.make_app_page({
+		parent: wrapper,
+		title: __("Kitchen Display"),
+		single_column: true,
+	});
+
+	frappe.require("/assets/zajel_general/js/kitchen_feed.js", () => {
+		wrapper.kitchen_display = new KitchenDisplay(page);
+	});
+};
+
+frappe.pages["kitchen-display"].on_page_hide = function (wrapper) {
+	wrapper.kitchen_display && wrapper.kitchen_display.stop_feed();
+};
+
+frappe.pages["kitchen-display"].on_page_show = function (wrapper) {
+	wrapper.kitchen_display && wrapper.kitchen_display.start_feed();
+};
+
+// Open tickets of a POS Profile, kept current by the realtime kitchen feed (no polling);
+// with a station selected, only that station's items and its queue.
+class KitchenDisplay {
+	constructor(page) {
+		this.page = page;
+		this.method = "zajel_general.zajel_general.doctype.kitchen_order_ticket.kitchen_queue";
+		this.$body = $('<div class="kitchen-display row"></div>').appendTo(page.body);
+
+		this.pos_profile = page.add_field({
+			fieldname: "pos_profile",
+			label: __("POS Profile"),
+			fieldtype: "Link",
+			options: "POS Profile",
+			change: () => this.start_feed(),
+		});
+		this.station = page.add_field({
+			fieldname: "station",
+			label: __("Kitchen Station"),
+			fieldtype: "Link",
+			options: "Kitchen Station",
+			change: () => this.render(),
+		});
+
+		page.set_primary_action(__("Claim Next"), () => this.claim_next());
+
+		this.$body.on("click", "[data-action]", (e) => {
+			const $button = $(e.currentTarget);
+			this.call($button.attr("data-action"), { item: $button.attr("data-item") });
+		});
+
+		// items of stations with a lower priority number are listed first
+		this.station_priority = {};
+		frappe.db
+			.get_list("Kitchen Station", { fields: ["name", "priority"], limit: 0 })
+			.then((stations) => {
+				stations.forEach((d) => (this.station_priority[d.name] = d.priority || 0));
+				this.render();
+			});
+
+		this.start_feed();
+	}
+
+	start_feed() {
+		const pos_profile = this.pos_profile.get_value() || "";
+		if (this.feed_running && this.feed.pos_profile === pos_profile) return;
+
+		this.stop_feed();
+		this.feed = new zajel_general.KitchenFeed({
+			pos_profile: pos_profile,
+			on_change: () => this.render(),
+		});
+		this.feed_running = true;
+		this.feed.start();
+	}
+
+	stop_feed() {
+		if (!this.feed_running) return;
+		this.feed_running = false;
+		this.feed.stop();
+	}
+
+	claim_next() {
+		const station = this.station.get_value();
+		if (!station) {
+			frappe.msgprint(__("Select a Kitchen Station to claim its next item"));
+			return;
+		}
+
+		this.call("claim_next_item", { station: station }).then((item) => {
+			if (!item) frappe.show_alert(__("No items waiting at {0}", [station]));
+		});
+	}
+
+	call(action, args) {
+		// the screen is updated by the feed once the change is committed
+		return frappe.xcall(`${this.method}.${action}`, args);
+	}
+
+	render() {
+		if (!this.feed) return;
+		const station = this.station.get_value();
+		const tickets = this.feed.get_tickets().filter((ticket) =>
+			ticket.items.some((item) => !station || item.station === station)
+		);
+
+		if (!tickets.length) {
+			this.$body.html(`<div class="col-12 text-muted text-center p-5">${__("No open tickets")}</div>`);
+			return;
+		}
+
+		this.$body.html(tickets.map((ticket) => this.get_ticket_html(ticket, station)).join(""));
+	}
+
+	get_ticket_html(ticket, station) {
+		const priority = (item) => this.station_priority[item.station] || 0;
+		const items = ticket.items
+			.filter((item) => !station || item.station === station)
+			.sort((a, b) => priority(a) - priority(b))
+			.map((item) => this.get_item_html(item))
+			.join("");
+
+		const title = [ticket.token_no && `#${ticket.token_no}`, ticket.table_no, ticket.kot_no || ticket.name]
+			.filter(Boolean)
+			.map((part) => frappe.utils.escape_html(String(part)))
+			.join(" · ");
+
+		return `<div class="col-md-4 col-sm-6 mb-4">
+			<div class="frappe-card p-3">
+				<div class="d-flex justify-content-between mb-2">
+					<b>${title}</b>
+					<span class="indicator-pill ${this.get_color(ticket.status)}">${__(ticket.status)}</span>
+				</div>
+				${ticket.notes ? `<div class="text-muted small mb-2">${frappe.utils.escape_html(ticket.notes)}</div>` : ""}
+				${items}
+			</div>
+		</div>`;
+	}
+
+	get_item_html(item) {
+		const actions = { inprogress: ["complete_item", __("Done")], completed: ["deliver_item", __("Delivered")] };
+		const action = actions[item.item_status];
+		const button = action
+			? `<button class="btn btn-xs btn-default" data-action="${action[0]}"
+				data-item="${frappe.utils.escape_html(item.name)}">${action[1]}</button>`
+			: "";
+
+		return `<div class="d-flex justify-content-between align-items-center border-top py-1">
+			<div>
+				${frappe.utils.escape_html(String(item.qty))} × ${frappe.utils.escape_html(item.item_name || item.item_code)}
+				${item.remarks ? `<div class="text-muted small">${frappe.utils.escape_html(item.remarks)}</div>` : ""}
+			</div>
+			<div>
+				<span class="indicator-pill ${this.get_color(item.item_status)}">${__(item.item_status)}</span>
+				${button}
+			</div>
+		</div>`;
+	}
+
+	get_color(status) {
+		return { todo: "orange", inprogress: "blue", completed: "green", delivered: "gray" }[status] || "gray";
+	}
+}
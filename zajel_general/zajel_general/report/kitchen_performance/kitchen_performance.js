@@ -0,0 +1,47 @@
+// Copyright (c) 2026, Hussain and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Kitchen Performance"] = {
+	filters: [
+		{
+			fieldname: "from_date",
+			label: __("From Date"),
+			fieldtype: "Date",
+			default: frappe.datetime.add_months(frappe.datetime.get_today(), -1),
+			reqd: 1
+		},
+		{
+			fieldname: "to_date",
+			label: __("To Date"),
+			fieldtype: "Date",
+			default: frappe.datetime.get_today(),
+			reqd: 1
+		},
+		{
+			fieldname: "group_by",
+			label: __("Group By"),
+			fieldtype: "Select",
+			options: ["Station", "Item Group", "POS Opening Shift", "Hour"],
+			default: "Station",
+			reqd: 1
+		},
+		{
+			fieldname: "station",
+			label: __("Station"),
+			fieldtype: "Link",
+			options: "Kitchen Station"
+		},
+		{
+			fieldname: "item_group",
+			label: __("Item Group"),
+			fieldtype: "Link",
+			options: "Item Group"
+		},
+		{
+			fieldname: "pos_opening_shift",
+			label: __("POS Opening Shift"),
+			fieldtype: "Link",
+			options: "POS Opening Shift"
+		}
+	]
+};
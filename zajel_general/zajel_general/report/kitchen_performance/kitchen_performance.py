@@ -0,0 +1,92 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import flt
+
+from zajel_general.zajel_general.doctype.kitchen_timing_aggregate.kitchen_timing_aggregate import get_percentile
+
+# group by option -> Kitchen Timing Aggregate column
+GROUP_BY_FIELDS = {
+	"Station": "station",
+	"Item Group": "item_group",
+	"POS Opening Shift": "pos_opening_shift",
+	"Hour": "hour",
+}
+METRICS = ("prep", "delivery")
+PERCENTILES = (50, 90, 99)
+
+
+def execute(filters=None):
+	filters = frappe._dict(filters or {})
+	validate_filters(filters)
+	return get_columns(filters), get_data(filters)
+
+
+def validate_filters(filters):
+	if not (filters.from_date and filters.to_date):
+		frappe.throw(_("From Date and To Date are mandatory"))
+	if filters.from_date > filters.to_date:
+		frappe.throw(_("From Date cannot be after To Date"))
+	if (filters.group_by or "Station") not in GROUP_BY_FIELDS:
+		frappe.throw(_("Invalid Group By {0}").format(filters.group_by))
+
+
+def get_columns(filters):
+	group_by = filters.group_by or "Station"
+	columns = [
+		{
+			"label": _(group_by),
+			"fieldname": "group_value",
+			"fieldtype": "Data" if group_by == "Hour" else "Link",
+			"options": {"Station": "Kitchen Station"}.get(group_by, group_by),
+			"width": 180,
+		}
+	]
+	for metric, label in (("prep", _("Prep")), ("delivery", _("Delivery"))):
+		columns.append({"label": _("{0} Count").format(label), "fieldname": f"{metric}_count", "fieldtype": "Int", "width": 100})
+		columns.append({"label": _("{0} Avg").format(label), "fieldname": f"{metric}_avg", "fieldtype": "Duration", "width": 110})
+		for p in PERCENTILES:
+			columns.append(
+				{"label": _("{0} p{1}").format(label, p), "fieldname": f"{metric}_p{p}", "fieldtype": "Duration", "width": 110}
+			)
+	return columns
+
+
+def get_data(filters):
+	"""One row per group, percentiles read off the histogram buckets of the aggregate table."""
+	group_field = GROUP_BY_FIELDS[filters.group_by or "Station"]
+	conditions = ["date between %(from_date)s and %(to_date)s"]
+	for field in ("station", "item_group", "pos_opening_shift"):
+		if filters.get(field):
+			conditions.append(f"{field} = %({field})s")
+
+	histograms, totals = {}, {}
+	for group_value, metric, bucket, count, seconds in frappe.db.sql(
+		f"""
+		select {group_field}, metric, bucket, sum(sample_count), sum(total_seconds)
+		from `tabKitchen Timing Aggregate`
+		where {" and ".join(conditions)}
+		group by {group_field}, metric, bucket
+		""",
+		filters,
+	):
+		histograms.setdefault((group_value, metric), {})[bucket] = int(count)
+		total = totals.setdefault((group_value, metric), [0, 0.0])
+		total[0] += int(count)
+		total[1] += flt(seconds)
+
+	data = []
+	for group_value in sorted({key[0] for key in histograms}, key=lambda v: (v is None, v)):
+		row = {"group_value": group_value if group_value is not None else _("Not Set")}
+		for metric in METRICS:
+			histogram = histograms.get((group_value, metric), {})
+			count, seconds = totals.get((group_value, metric), (0, 0.0))
+			row[f"{metric}_count"] = count
+			row[f"{metric}_avg"] = flt(seconds / count) if count else None
+			for p in PERCENTILES:
+				row[f"{metric}_p{p}"] = get_percentile(histogram, p)
+		data.append(row)
+
+	return data
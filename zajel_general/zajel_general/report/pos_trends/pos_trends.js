@@ -2,6 +2,40 @@
 // For license information, please see license.txt
 
 frappe.query_reports["POS Trends"] = {
+	onload(report) {
+		report.page.add_inner_button(__("Export in Background"), () => {
+			frappe.prompt(
+				{
+					fieldname: "file_format",
+					label: __("Format"),
+					fieldtype: "Select",
+					options: ["CSV", "Excel"],
+					default: "CSV",
+					reqd: 1
+				},
+				(values) => {
+					frappe.call({
+						method: "zajel_general.zajel_general.report.pos_trends.pos_trends_export.enqueue_export",
+						args: {
+							filters: report.get_values(),
+							file_format: values.file_format
+						}
+					});
+				},
+				__("Export POS Trends")
+			);
+		});
+
+		frappe.realtime.off("pos_trends_export_ready");
+		frappe.realtime.on("pos_trends_export_ready", (data) => {
+			frappe.msgprint(
+				__("POS Trends export is ready ({0} rows): {1}", [
+					data.rows,
+					`<a href="${data.file_url}" target="_blank">${data.file_name}</a>`
+				])
+			);
+		});
+	},
 
 	filters: [
 		{
@@ -38,12 +72,31 @@ frappe.query_reports["POS Trends"] = {
 			fieldtype: "Date",
 			reqd: 1
 		},
+		{
+			fieldname: "periodicity",
+			label: __("Periodicity"),
+			fieldtype: "Select",
+			options: [
+				{ value: "", label: __("Whole Range") },
+				{ value: "Daily", label: __("Daily") },
+				{ value: "Weekly", label: __("Weekly") },
+				{ value: "Monthly", label: __("Monthly") },
+				{ value: "Quarterly", label: __("Quarterly") }
+			],
+			default: ""
+		},
 		{
 			fieldname: "item_group",
 			label: __("Item Group (Optional)"),
 			fieldtype: "Link",
 			options: "Item Group",
 			depends_on: "eval: doc.based_on == 'Item Group'"
+		},
+		{
+			fieldname: "use_rollup",
+			label: __("Use Daily Rollup"),
+			fieldtype: "Check",
+			default: 0
 		}
 	]
 };
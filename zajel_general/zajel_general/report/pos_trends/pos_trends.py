@@ -1,10 +1,26 @@
 # file: erpnext/accounts/report/sales_invoice_trends_by_date/sales_invoice_trends_by_date.py
 
+from decimal import Decimal
+from itertools import groupby
+
 import frappe
 from frappe import _
-from frappe.utils import getdate
+from frappe.utils import (
+	add_days,
+	cint,
+	formatdate,
+	get_last_day,
+	get_last_day_of_week,
+	get_quarter_ending,
+	getdate,
+)
+
+from zajel_general.zajel_general.report.pos_trends.pos_trends_cache import get_cached_result
 
 def execute(filters=None):
+	return get_cached_result(filters, get_result)
+
+def get_result(filters):
 	# force this clone to be Sales Invoice only
 	trans = "Sales Invoice"
 	conds = get_columns(filters, trans)
@@ -17,16 +33,8 @@ def get_columns(filters, trans):
 	# based_on section (unchanged)
 	based_on_details = based_wise_columns_query(filters.get("based_on"), trans)
 
-	# *** minimal change: single date-range bucket instead of Periods/FY ***
-	period_cols = [
-		_("Qty") + ":Float:120",
-		_("Amt") + ":Currency/currency:120",
-	]
-	# we still keep the same interface key name to avoid touching other code paths
-	period_select = (
-		"SUM(CASE WHEN t1.posting_date BETWEEN %(from_date)s AND %(to_date)s THEN t2.stock_qty END),"
-		"SUM(CASE WHEN t1.posting_date BETWEEN %(from_date)s AND %(to_date)s THEN t2.base_net_amount END),"
-	)
+	# one Qty/Amt bucket per period, all filled from the same scan
+	period_cols, period_select = period_wise_columns_query(filters)
 
 	# group-by header (unchanged)
 	group_by_cols = group_wise_column(filters.get("group_by"))
@@ -44,16 +52,84 @@ def get_columns(filters, trans):
 		)
 
 	return {
-		"based_on_select": based_on_details["based_on_select"],
-		"period_wise_select": period_select + "SUM(t2.stock_qty), SUM(t2.base_net_amount)",
+		"based_on_select": rebase_columns(based_on_details["based_on_select"], filters),
+		"period_wise_select": rebase_columns(
+			period_select + "SUM(t2.stock_qty), SUM(t2.base_net_amount)", filters
+		),
 		"columns": columns,
-		"group_by": based_on_details["based_on_group_by"],
+		"based_on_cols": based_on_details["based_on_cols"],
+		"group_by": rebase_columns(based_on_details["based_on_group_by"], filters),
 		"grbc": group_by_cols,
 		"trans": trans,
 		"addl_tables": based_on_details["addl_tables"],
 		"addl_tables_relational_cond": based_on_details.get("addl_tables_relational_cond", ""),
 	}
 
+def period_wise_columns_query(filters):
+	if not filters.get("periodicity"):
+		# single date-range bucket
+		period_cols = [
+			_("Qty") + ":Float:120",
+			_("Amt") + ":Currency/currency:120",
+		]
+		period_select = (
+			"SUM(CASE WHEN t1.posting_date BETWEEN %(from_date)s AND %(to_date)s THEN t2.stock_qty END),"
+			"SUM(CASE WHEN t1.posting_date BETWEEN %(from_date)s AND %(to_date)s THEN t2.base_net_amount END),"
+		)
+		return period_cols, period_select
+
+	period_cols, period_select = [], ""
+	for from_date, to_date in get_period_date_ranges(filters):
+		label = get_period_label(from_date, to_date, filters.get("periodicity"))
+		period_cols += [
+			label + " (" + _("Qty") + "):Float:120",
+			label + " (" + _("Amt") + "):Currency/currency:120",
+		]
+		period_select += (
+			f"SUM(CASE WHEN t1.posting_date BETWEEN '{from_date}' AND '{to_date}' THEN t2.stock_qty END),"
+			f"SUM(CASE WHEN t1.posting_date BETWEEN '{from_date}' AND '{to_date}' THEN t2.base_net_amount END),"
+		)
+
+	return period_cols, period_select
+
+def get_period_date_ranges(filters):
+	period_end = PERIOD_END.get(filters.get("periodicity"))
+	if not period_end:
+		frappe.throw(_("Unsupported Periodicity {0}").format(filters.get("periodicity")))
+
+	from_date, to_date = getdate(filters.get("from_date")), getdate(filters.get("to_date"))
+	ranges = []
+	while from_date <= to_date:
+		end_date = min(getdate(period_end(from_date)), to_date)
+		ranges.append((from_date, end_date))
+		from_date = add_days(end_date, 1)
+
+	if len(ranges) > MAX_PERIODS:
+		frappe.throw(
+			_("{0} periods between From Date and To Date, select a longer Periodicity").format(len(ranges))
+		)
+
+	return ranges
+
+def get_period_label(from_date, to_date, periodicity):
+	if periodicity == "Daily":
+		return formatdate(from_date)
+	elif periodicity == "Monthly":
+		return _(get_mon(from_date)) + " " + str(from_date.year)
+	elif periodicity == "Quarterly":
+		return _(get_mon(from_date)) + "-" + _(get_mon(to_date)) + " " + str(to_date.year)
+	return formatdate(from_date) + " - " + formatdate(to_date)
+
+PERIOD_END = {
+	"Daily": lambda d: d,
+	"Weekly": get_last_day_of_week,
+	"Monthly": get_last_day,
+	"Quarterly": get_quarter_ending,
+}
+
+# every period adds two SUM columns to the query
+MAX_PERIODS = 400
+
 def validate_filters(filters):
 	# minimal: require company, based_on, from/to dates
 	for f in ["Company", "Based On", "From Date", "To Date"]:
@@ -62,165 +138,180 @@ def validate_filters(filters):
 			frappe.throw(_("{0} is mandatory").format(_(f)))
 	if filters.get("based_on") == filters.get("group_by"):
 		frappe.throw(_("'Based On' and 'Group By' cannot be the same"))
+	if use_rollup(filters) and "Project" in (filters.get("based_on"), filters.get("group_by")):
+		frappe.throw(_("Project is not available in the daily sales rollup"))
+
+def use_rollup(filters):
+	"""Answer from the pre-aggregated POS Sales Rollup instead of the invoice rows."""
+	return cint(filters.get("use_rollup"))
+
+def rebase_columns(sql, filters):
+	# the rollup table carries both invoice and item columns, under the invoice alias
+	return sql.replace("t2.", "t1.") if use_rollup(filters) else sql
+
+def get_source(filters, conditions):
+	"""Tables to aggregate and the conditions joining them."""
+	if use_rollup(filters):
+		return f"`tabPOS Sales Rollup` t1 {conditions['addl_tables']}", "1 = 1"
+
+	return (
+		f"`tab{conditions['trans']}` t1, `tab{conditions['trans']} Item` t2 {conditions['addl_tables']}",
+		"t2.parent = t1.name and t1.docstatus = 1",
+	)
 
 def get_data(filters, conditions):
-	data = []
-	posting_date = "t1.posting_date"
+	params = get_query_params(filters)
+
+	# handle group_by branch: one aggregate per (based_on, group_by) pair, pivoted in python
+	if filters.get("group_by"):
+		rows = frappe.db.sql(get_grouped_query(filters, conditions), params, as_list=True)
+		data = list(pivot_grouped_rows(rows, conditions))
+
+	else:
+		# non-group_by path: one row per based_on group
+		data = frappe.db.sql(get_query(filters, conditions), params, as_list=True)
+
+	return data
 
-	# optional extra condition: only apply item_group filter when provided
-	extra_cond = ""
+def iter_data(filters, conditions):
+	"""
+	Same rows as `get_data`, fetched lazily. Run it inside `frappe.db.unbuffered_cursor()`
+	so the database streams the result instead of the driver buffering all of it.
+	"""
+	params = get_query_params(filters)
+
+	if filters.get("group_by"):
+		rows = frappe.db.sql(get_grouped_query(filters, conditions), params, as_iterator=True)
+		yield from pivot_grouped_rows(rows, conditions)
+	else:
+		yield from frappe.db.sql(get_query(filters, conditions), params, as_iterator=True)
+
+def get_query_params(filters):
 	params = {
 		"company": filters.get("company"),
 		"from_date": filters.get("from_date"),
 		"to_date": filters.get("to_date"),
 	}
-
-	# if you supply an Item Group filter, apply it (works regardless of Based On / Group By)
 	if filters.get("item_group"):
-		extra_cond += " and t2.item_group = %(item_group)s"
 		params["item_group"] = filters.get("item_group")
 
-	# handle group_by branch (kept identical to original, only date/params changed)
-	if filters.get("group_by"):
-		query_details = conditions["based_on_select"] + conditions["period_wise_select"]
-		cond = ""
-		if conditions["based_on_select"] in ["t1.project,", "t2.project,"]:
-			cond = " and " + conditions["based_on_select"][:-1] + " IS NOT NULL"
-
-		# the columns array position where group_by value is inserted
-		ind = conditions["columns"].index(conditions["grbc"][0])
-
-		# figure select column for the inner DISTINCT (unchanged)
-		if filters.get("group_by") == "Item":
-			sel_col = "t2.item_code"
-		elif filters.get("group_by") == "Customer":
-			sel_col = "t1.customer"
-		elif filters.get("group_by") == "Supplier":
-			sel_col = "t1.supplier"
-		elif filters.get("group_by") == "Project":
-			sel_col = "t1.project"
-		elif filters.get("group_by") == "Territory":
-			sel_col = "t1.territory"
-		elif filters.get("group_by") == "Customer Group":
-			sel_col = "t1.customer_group"
-		elif filters.get("group_by") == "Item Group":
-			sel_col = "t2.item_group"
-		else:
-			sel_col = conditions["group_by"]  # fallback
-
-		# how many leading cols to skip when placing period/total values
-		if filters.get("based_on") in ["Customer", "Supplier"]:
-			inc = 3
-		elif filters.get("based_on") in ["Item"]:
-			inc = 2
-		else:
-			inc = 1
-
-		# outer list by based_on_group
-		data1 = frappe.db.sql(
-			f"""
-			select {query_details}
-			from `tab{conditions['trans']}` t1, `tab{conditions['trans']} Item` t2 {conditions['addl_tables']}
-			where t2.parent = t1.name
-			  and t1.company = %(company)s
-			  and t1.docstatus = 1
-			  {conditions.get('addl_tables_relational_cond','')}
-			  {cond}
-			  {extra_cond}
-			group by {conditions['group_by']}
-			""",
-			params,
-			as_list=True,
-		)
+	return params
 
-		for d in range(len(data1)):
-			dt = list(data1[d])
-			dt.insert(ind, "")  # blank column for group_by value
-			data.append(dt)
-
-			# distinct inner values for the requested group_by dimension under this based_on group
-			row = frappe.db.sql(
-			f"""
-			select distinct({sel_col})
-			from `tab{conditions['trans']}` t1, `tab{conditions['trans']} Item` t2 {conditions['addl_tables']}
-			where t2.parent = t1.name
-			and t1.company = %(company)s
-			and t1.docstatus = 1
-			{conditions.get('addl_tables_relational_cond','')}
-			and {conditions['group_by']} = %(group_value)s
-			and t1.posting_date between %(from_date)s and %(to_date)s
-			{extra_cond}
-			""",
-			{
-			**params,
-			"group_value": data1[d][0],  # <- value for the based_on group you’re iterating
-			},
-			as_list=True,
-			)
-
-			for i in range(len(row)):
-				des = ["" for _ in range(len(conditions["columns"]))]
-
-				# pull metrics for this (based_on group, group_by item)
-				row1 = frappe.db.sql(
-				f"""
-				select t4.default_currency as currency,
-				{sel_col},
-				{conditions['period_wise_select']}
-				from `tab{conditions['trans']}` t1,
-				`tab{conditions['trans']} Item` t2
-				{conditions['addl_tables']}
-				where t2.parent = t1.name
-				and t1.company = %(company)s
-				and t1.docstatus = 1
-				and {sel_col} = %(sel_value)s
-				and {conditions['group_by']} = %(group_value)s
-				{conditions.get('addl_tables_relational_cond','')}
-				and t1.posting_date between %(from_date)s and %(to_date)s
-				{extra_cond}
-				""",
-				{
-				**params,
-				"sel_value": row[i][0],   # <- value from the distinct row
-				"group_value": data1[d][0],
-				},
-				as_list=True,
-				)
-
-				des[ind] = row[i][0]                  # the group_by value
-				des[ind - 1] = row1[0][0]            # currency
-
-				# copy the numeric measures into the row in the same positions as original code
-				for j in range(1, len(conditions["columns"]) - inc):
-					des[j + inc] = row1[0][j]
-
-				data.append(des)
-
-	else:
-		# non-group_by path: one row per based_on group
-		query_details = conditions["based_on_select"] + conditions["period_wise_select"]
-		cond = ""
-		if conditions["based_on_select"] in ["t1.project,", "t2.project,"]:
-			cond = " and " + conditions["based_on_select"][:-1] + " IS NOT NULL"
-
-		data = frappe.db.sql(
-			f"""
-			select {query_details}
-			from `tab{conditions['trans']}` t1, `tab{conditions['trans']} Item` t2 {conditions['addl_tables']}
-			where t2.parent = t1.name
-			  and t1.company = %(company)s
-			  and t1.docstatus = 1
-			  and t1.posting_date between %(from_date)s and %(to_date)s
-			  {cond}
-			  {conditions.get('addl_tables_relational_cond','')}
-			  {extra_cond}
-			group by {conditions['group_by']}
-			""",
-			params,
-			as_list=True,
-		)
+def get_conditions(conditions, filters):
+	cond = ""
+	if conditions["based_on_select"] in ["t1.project,", "t2.project,"]:
+		cond = " and " + conditions["based_on_select"][:-1] + " IS NOT NULL"
 
-	return data
+	# if you supply an Item Group filter, apply it (works regardless of Based On / Group By)
+	if filters.get("item_group"):
+		cond += " and t2.item_group = %(item_group)s"
+
+	return rebase_columns(cond, filters)
+
+def get_query(filters, conditions):
+	tables, join_cond = get_source(filters, conditions)
+	return f"""
+		select {conditions["based_on_select"]} {conditions["period_wise_select"]}
+		from {tables}
+		where {join_cond}
+		  and t1.company = %(company)s
+		  and t1.posting_date between %(from_date)s and %(to_date)s
+		  {conditions.get('addl_tables_relational_cond','')}
+		  {get_conditions(conditions, filters)}
+		group by {conditions['group_by']}
+	"""
+
+def get_grouped_query(filters, conditions):
+	"""
+	One row per (based_on, group_by) pair, ordered by based_on:
+	based_on columns, group_by value, period buckets, totals, in-range row count.
+
+	Totals span all dates (the based_on header rows have always shown all-time totals);
+	the in-range count tells whether the pair gets a detail row.
+	"""
+	sel_col = get_group_by_field(filters, conditions)
+	tables, join_cond = get_source(filters, conditions)
+
+	return f"""
+		select {conditions["based_on_select"]} {sel_col},
+			{conditions["period_wise_select"]},
+			count(case when t1.posting_date between %(from_date)s and %(to_date)s then 1 end)
+		from {tables}
+		where {join_cond}
+		  and t1.company = %(company)s
+		  {conditions.get('addl_tables_relational_cond','')}
+		  {get_conditions(conditions, filters)}
+		group by {conditions['group_by']}, {sel_col}
+		order by {conditions['group_by']}, {sel_col}
+	"""
+
+def get_group_by_field(filters, conditions):
+	field = GROUP_BY_FIELDS.get(filters.get("group_by"))
+	return rebase_columns(field, filters) if field else conditions["group_by"]
+
+GROUP_BY_FIELDS = {
+	"Item": "t2.item_code",
+	"Customer": "t1.customer",
+	"Supplier": "t1.supplier",
+	"Project": "t1.project",
+	"Territory": "t1.territory",
+	"Customer Group": "t1.customer_group",
+	"Item Group": "t2.item_group",
+}
+
+def pivot_grouped_rows(rows, conditions):
+	"""
+	Turn the rows of `get_grouped_query` into a based_on header row followed by
+	one detail row per group_by value, in the report's column layout.
+	"""
+	# the columns array position where group_by value is inserted
+	ind = conditions["columns"].index(conditions["grbc"][0])
+	width = len(conditions["columns"])
+	# number of based_on columns (currency included) leading each query row
+	based_on_width = len(conditions["based_on_cols"])
+	# how many leading cols to skip when placing period/total values
+	inc = based_on_width - 1
+
+	for group_value, group_rows in groupby(rows, key=lambda r: r[0]):
+		group_rows = list(group_rows)
+
+		# header: based_on columns and the periods/totals summed over the group
+		header = list(group_rows[0][:based_on_width])
+		for i in range(based_on_width + 1, len(group_rows[0]) - 1):
+			header.append(sum_values(r[i] for r in group_rows))
+		header.insert(ind, "")  # blank column for group_by value
+		yield header
+
+		if group_value is None:
+			continue
+
+		for r in group_rows:
+			# group_by values without transactions in the date range get no row
+			if not r[-1]:
+				continue
+
+			# currency, group_by value, periods, totals
+			measures = r[based_on_width - 1 : -1]
+			if r[based_on_width] is None:
+				# a null group_by value never matched the per-value lookup, which came back empty
+				measures = [None] * len(measures)
+
+			des = ["" for _ in range(width)]
+			des[ind] = r[based_on_width]  # the group_by value
+			des[ind - 1] = measures[0]  # currency
+			for j in range(1, width - inc):
+				des[j + inc] = measures[j]
+
+			yield des
+
+def sum_values(values):
+	"""SQL-style SUM: None when every value is None, summed in decimal to match the database."""
+	total = None
+	for value in values:
+		if value is not None:
+			total = (total or Decimal(0)) + Decimal(str(value))
+
+	return None if total is None else float(total)
 
 # === Helpers copied from original, unchanged ===
 
@@ -0,0 +1,105 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import hashlib
+import json
+import time
+
+import frappe
+from frappe.utils import cint, getdate
+
+from zajel_general.utils import get_counters, incr_counters, reset_counters
+
+CACHE_KEY = "zajel_general:pos_trends:{0}"
+# per company: cache key -> the posting dates its result depends on
+INDEX_KEY = "zajel_general:pos_trends_index:{0}"
+STATS_KEY = "zajel_general:pos_trends_stats"
+CACHE_TTL = 15 * 60
+
+DATE_FILTERS = ("from_date", "to_date")
+
+
+def get_cached_result(filters, compute):
+	"""Return `compute(filters)`, cached under the normalized filters for CACHE_TTL seconds."""
+	key = get_cache_key(filters)
+
+	result = frappe.cache.get_value(key)
+	if result is not None:
+		incr_counters(STATS_KEY, {"hits": 1})
+		return result
+
+	start = time.monotonic()
+	result = compute(filters)
+	elapsed = time.monotonic() - start
+
+	frappe.cache.set_value(key, result, expires_in_sec=CACHE_TTL)
+	index_key = INDEX_KEY.format(filters.get("company"))
+	frappe.cache.hset(
+		index_key,
+		key,
+		{
+			"from_date": str(getdate(filters.get("from_date"))),
+			"to_date": str(getdate(filters.get("to_date"))),
+			# grouped header rows carry totals over all dates
+			"all_dates": bool(filters.get("group_by")),
+		},
+	)
+	frappe.cache.expire(frappe.cache.make_key(index_key), CACHE_TTL)
+
+	incr_counters(STATS_KEY, {"misses": 1, "compute_seconds": elapsed})
+	return result
+
+
+def get_cache_key(filters):
+	normalized = {}
+	for fieldname, value in filters.items():
+		if value in (None, "", 0, "0"):
+			continue
+		normalized[fieldname] = str(getdate(value)) if fieldname in DATE_FILTERS else value
+
+	digest = hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode()).hexdigest()
+	return CACHE_KEY.format(digest)
+
+
+def invalidate_for_invoice(sales_invoice):
+	"""Drop cached results of the invoice's company whose figures include its posting date."""
+	invalidate(sales_invoice.company, str(getdate(sales_invoice.posting_date)))
+	# again after commit, in case a concurrent request cached the pre-commit figures meanwhile
+	frappe.db.after_commit.add(
+		lambda: invalidate(sales_invoice.company, str(getdate(sales_invoice.posting_date)))
+	)
+
+
+def invalidate(company, posting_date):
+	index_key = INDEX_KEY.format(company)
+	for key, scope in frappe.cache.hgetall(index_key).items():
+		key = frappe.safe_decode(key)
+		if scope["all_dates"] or scope["from_date"] <= posting_date <= scope["to_date"]:
+			frappe.cache.delete_value(key)
+			frappe.cache.hdel(index_key, key)
+
+
+def clear_cache(company=None):
+	"""Drop every cached result of the company (all companies if not given), e.g. after a rollup rebuild."""
+	for name in [company] if company else frappe.get_all("Company", pluck="name"):
+		index_key = INDEX_KEY.format(name)
+		for key in frappe.cache.hgetall(index_key):
+			frappe.cache.delete_value(frappe.safe_decode(key))
+		frappe.cache.delete_value(index_key)
+
+
+@frappe.whitelist()
+def get_cache_stats(reset=False):
+	frappe.only_for("System Manager")
+
+	stats = get_counters(STATS_KEY)
+	stats.setdefault("hits", 0)
+	stats.setdefault("misses", 0)
+	stats.setdefault("compute_seconds", 0.0)
+	requests = stats["hits"] + stats["misses"]
+	stats["hit_ratio"] = stats["hits"] / requests if requests else 0.0
+	stats["avg_compute_seconds"] = stats["compute_seconds"] / stats["misses"] if stats["misses"] else 0.0
+
+	if cint(reset):
+		reset_counters(STATS_KEY)
+	return stats
@@ -0,0 +1,111 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import csv
+import json
+from itertools import islice
+
+import frappe
+from frappe import _
+from openpyxl import Workbook
+
+from zajel_general.zajel_general.report.pos_trends.pos_trends import get_columns, iter_data
+
+# rows handed to the file writer at a time
+CHUNK_SIZE = 5000
+
+
+@frappe.whitelist()
+def enqueue_export(filters, file_format="CSV"):
+	"""Export POS Trends to a private file in a background job and notify the user when done."""
+	if not frappe.get_doc("Report", "POS Trends").is_permitted():
+		frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+	if file_format not in ("CSV", "Excel"):
+		frappe.throw(_("Unsupported format {0}").format(file_format))
+
+	filters = frappe._dict(json.loads(filters) if isinstance(filters, str) else filters)
+	# fail fast on bad filters instead of in the job
+	get_columns(filters, "Sales Invoice")
+
+	frappe.enqueue(
+		export_pos_trends,
+		queue="long",
+		timeout=3600,
+		filters=filters,
+		file_format=file_format,
+		user=frappe.session.user,
+	)
+	frappe.msgprint(_("The export has been queued, you will be notified when the file is ready."))
+
+
+def export_pos_trends(filters, file_format, user):
+	conditions = get_columns(filters, "Sales Invoice")
+	header = [column.split(":")[0] for column in conditions["columns"]]
+
+	file_name = "pos-trends-{0}.{1}".format(
+		frappe.generate_hash(length=10), "csv" if file_format == "CSV" else "xlsx"
+	)
+	path = frappe.get_site_path("private", "files", file_name)
+
+	with frappe.db.unbuffered_cursor():
+		rows = iter_data(filters, conditions)
+		if file_format == "CSV":
+			row_count = write_csv(path, header, rows)
+		else:
+			row_count = write_xlsx(path, header, rows)
+
+	# not attached to the report, whose readers could then see every user's exports: a
+	# private, unattached file is only readable by its owner
+	file_doc = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": "/private/files/" + file_name,
+			"is_private": 1,
+			"owner": user,
+		}
+	)
+	file_doc.flags.ignore_permissions = True
+	file_doc.insert()
+	frappe.db.commit()
+
+	frappe.publish_realtime(
+		"pos_trends_export_ready",
+		{"file_url": file_doc.file_url, "file_name": file_name, "rows": row_count},
+		user=user,
+	)
+
+
+def write_csv(path, header, rows):
+	count = 0
+	with open(path, "w", newline="", encoding="utf-8") as f:
+		writer = csv.writer(f)
+		writer.writerow(header)
+		for chunk in iter_chunks(rows):
+			writer.writerows(chunk)
+			count += len(chunk)
+
+	return count
+
+
+def write_xlsx(path, header, rows):
+	# write-only workbooks stream rows to disk instead of building the sheet in memory
+	workbook = Workbook(write_only=True)
+	sheet = workbook.create_sheet("POS Trends")
+	sheet.append(header)
+
+	count = 0
+	for chunk in iter_chunks(rows):
+		for row in chunk:
+			sheet.append(list(row))
+		count += len(chunk)
+
+	workbook.save(path)
+	return count
+
+
+def iter_chunks(rows, size=CHUNK_SIZE):
+	rows = iter(rows)
+	while chunk := list(islice(rows, size)):
+		yield chunk
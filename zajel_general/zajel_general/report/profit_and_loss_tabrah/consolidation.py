@@ -0,0 +1,187 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import flt
+from frappe.utils.background_jobs import get_job
+
+from erpnext.accounts.report.financial_statements import add_total_row
+
+from zajel_general.zajel_general.report.profit_and_loss_tabrah.period_snapshots import get_statement_data
+
+RESULT_KEY = "zajel_general:pl_tabrah_result:{0}:{1}"
+CLAIM_KEY = "zajel_general:pl_tabrah_claim:{0}:{1}"
+JOB_ID = "pl_tabrah:{0}:{1}"
+JOB_TIMEOUT = 1500
+POLL_INTERVAL = 0.25
+
+
+def get_companies(filters):
+	companies = filters.get("companies")
+	if isinstance(companies, str):
+		companies = frappe.parse_json(companies) if companies.startswith("[") else [companies]
+	return list(dict.fromkeys(companies or []))
+
+
+def get_consolidated_data(companies, period_list, filters, currency):
+	"""
+	Income and Expense trees merged over `companies`. Each company is computed by a
+	background worker; companies no worker has picked up yet are computed here meanwhile,
+	so the run finishes even when the queue is busy. With no free worker this process
+	computes every company itself, no slower than without the jobs.
+	"""
+	validate_currencies(companies, filters)
+
+	run_id = frappe.generate_hash(length=12)
+	for company in companies:
+		frappe.enqueue(
+			compute_company_statement,
+			queue="long",
+			timeout=JOB_TIMEOUT,
+			job_id=JOB_ID.format(run_id, company),
+			run_id=run_id,
+			company=company,
+			period_list=period_list,
+			filters=filters,
+		)
+
+	for company in companies:
+		compute_company_statement(run_id, company, period_list, filters)
+
+	statements = wait_for_statements(run_id, companies)
+
+	income = merge_statements([s["income"] for s in statements], period_list, "Income", "Credit", currency)
+	expense = merge_statements([s["expense"] for s in statements], period_list, "Expense", "Debit", currency)
+	return income, expense
+
+
+def validate_currencies(companies, filters):
+	if filters.presentation_currency:
+		return
+
+	currencies = {frappe.get_cached_value("Company", company, "default_currency") for company in companies}
+	if len(currencies) > 1:
+		frappe.throw(_("The selected companies use different currencies, please set a Presentation Currency"))
+
+
+def compute_company_statement(run_id, company, period_list, filters):
+	"""Compute one company's Income and Expense trees, unless another process already claimed it."""
+	claim_key = frappe.cache.make_key(CLAIM_KEY.format(run_id, company))
+	if not frappe.cache.set(claim_key, 1, nx=True, ex=JOB_TIMEOUT):
+		return
+
+	result_key = RESULT_KEY.format(run_id, company)
+	company_filters = frappe._dict(filters, company=company)
+	try:
+		result = {
+			"income": get_statement_data(company, "Income", "Credit", period_list, company_filters),
+			"expense": get_statement_data(company, "Expense", "Debit", period_list, company_filters),
+		}
+	except Exception:
+		# not raised, the job then ends normally and commits the Error Log; the waiting report throws
+		log = frappe.log_error(title=_("Profit and Loss for {0} failed").format(company))
+		error = _("see Error Log {0}").format(log.name) if log else _("see the Error Log")
+		frappe.cache.set_value(result_key, {"error": error}, expires_in_sec=JOB_TIMEOUT)
+		return
+	except BaseException:
+		# a job timeout, so that the waiting report fails right away
+		frappe.cache.set_value(
+			result_key, {"error": _("the background job was stopped")}, expires_in_sec=JOB_TIMEOUT
+		)
+		raise
+
+	frappe.cache.set_value(result_key, result, expires_in_sec=JOB_TIMEOUT)
+
+
+def wait_for_statements(run_id, companies):
+	deadline = time.monotonic() + JOB_TIMEOUT
+	results = {}
+	while len(results) < len(companies):
+		for company in companies:
+			if company in results:
+				continue
+			# read the job status before the result, a job finishing in between then still counts
+			job_ended = is_job_ended(run_id, company)
+			# expires=True skips the request-local cache, which would keep returning None
+			result = frappe.cache.get_value(RESULT_KEY.format(run_id, company), expires=True)
+			if result is None and job_ended:
+				# the worker died (or was stopped) before it could record a result
+				result = {"error": _("the background job ended without a result")}
+			if result is None:
+				continue
+			if result.get("error"):
+				frappe.throw(_("Profit and Loss for {0} failed: {1}").format(company, result["error"]))
+			results[company] = result
+
+		if len(results) < len(companies):
+			if time.monotonic() > deadline:
+				frappe.throw(_("Timed out waiting for the company-wise Profit and Loss"))
+			time.sleep(POLL_INTERVAL)
+
+	return [results[company] for company in companies]
+
+
+def is_job_ended(run_id, company):
+	"""Whether the company's job is finished, failed or gone; a missing result then will not come."""
+	job = get_job(JOB_ID.format(run_id, company))
+	return not job or job.get_status(refresh=True) in ("finished", "failed", "stopped", "canceled")
+
+
+def merge_statements(statements, period_list, root_type, balance_must_be, currency):
+	"""
+	Merge company account trees on account name (with number), summing period values,
+	then recompute totals and the root total row like get_data does.
+	"""
+	merged, children, roots = {}, {}, []
+	for rows in statements:
+		account_rows = [row for row in rows or [] if "parent_account" in row]
+		names = {row.account: row.account_name for row in account_rows}
+
+		for row in account_rows:
+			key = row.account_name
+			parent = names.get(row.parent_account) if row.parent_account else None
+			target = merged.get(key)
+			if not target:
+				target = merged[key] = frappe._dict(row, account=key, parent_account=parent or "")
+				for period in period_list:
+					target[period.key] = 0.0
+				if parent:
+					children.setdefault(parent, []).append(key)
+				else:
+					roots.append(key)
+
+			for period in period_list:
+				target[period.key] += flt(row.get(period.key))
+
+	out = []
+
+	def add_subtree(keys, indent):
+		for key in keys:
+			row = merged[key]
+			row.indent = indent
+			row.currency = currency
+			set_total(row, period_list)
+			out.append(row)
+			add_subtree(children.get(key, []), indent + 1)
+
+	add_subtree(roots, 0)
+	if not out:
+		return out
+
+	add_total_row(out, root_type, balance_must_be, period_list, currency)
+	return out
+
+
+def set_total(row, period_list):
+	has_value, total = False, 0
+	for period in period_list:
+		row[period.key] = flt(row[period.key], 3)
+		if abs(row[period.key]) >= 0.005:
+			has_value = True
+			total += flt(row[period.key])
+
+	row.has_value = has_value
+	row.total = total
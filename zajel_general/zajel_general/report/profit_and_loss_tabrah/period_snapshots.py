@@ -0,0 +1,315 @@
+# Copyright (c) 2026, Hussain and contributors
+# For license information, please see license.txt
+
+import hashlib
+import json
+
+import frappe
+from frappe.utils import cint, flt, getdate, now
+
+from erpnext.accounts.report.financial_statements import add_total_row, get_data
+
+CLOSED_TILL_KEY = "zajel_general:pl_closed_till"
+
+# filters that pick periods or presentation, every other filter changes the balances
+NON_BALANCE_FILTERS = (
+	"company",
+	"companies",
+	"from_fiscal_year",
+	"to_fiscal_year",
+	"period_start_date",
+	"period_end_date",
+	"filter_based_on",
+	"periodicity",
+	"accumulated_values",
+	"selected_view",
+	"use_period_snapshots",
+)
+
+SNAPSHOT_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"company",
+	"root_type",
+	"filters_key",
+	"from_date",
+	"to_date",
+	"account",
+	"account_name",
+	"parent_account",
+	"indent",
+	"is_group",
+	"account_type",
+	"include_in_gross",
+	"balance",
+)
+
+# account details carried from get_data rows into the merged rows
+ROW_FIELDS = (
+	"account",
+	"account_name",
+	"parent_account",
+	"indent",
+	"is_group",
+	"account_type",
+	"include_in_gross",
+)
+
+
+def get_statement_data(company, root_type, balance_must_be, period_list, filters):
+	"""
+	`get_data` for an Income or Expense tree, with the balances of closed periods read from
+	Profit and Loss Snapshot rows; only open periods (and closed ones without a snapshot yet)
+	are aggregated from GL Entries. Missing snapshots are built by a background job, the
+	report itself only reads.
+	"""
+	closed_periods = get_closed_periods(company, period_list, filters)
+	if not closed_periods:
+		return get_data(
+			company,
+			root_type,
+			balance_must_be,
+			period_list,
+			filters=filters,
+			accumulated_values=filters.accumulated_values,
+			ignore_closing_entries=True,
+		)
+
+	filters_key = get_filters_key(filters)
+	snapshots = get_snapshots(company, root_type, filters_key, closed_periods)
+	missing = [period for period in closed_periods if get_period_range(period) not in snapshots]
+	live_periods = [period for period in period_list if period not in closed_periods or period in missing]
+
+	accounts, balances = {}, {}
+	for period in closed_periods:
+		for d in snapshots.get(get_period_range(period), []):
+			accounts.setdefault(d.account, d)
+			balances.setdefault(d.account, {})[period.key] = d.balance
+
+	if live_periods:
+		live = get_data(
+			company,
+			root_type,
+			balance_must_be,
+			live_periods,
+			filters=filters,
+			accumulated_values=0,
+			ignore_closing_entries=True,
+		)
+		live_rows = [row for row in live or [] if "parent_account" in row]
+		for row in live_rows:
+			accounts.setdefault(row.account, frappe._dict({f: row.get(f) for f in ROW_FIELDS}))
+			for period in live_periods:
+				balances.setdefault(row.account, {})[period.key] = flt(row.get(period.key))
+
+	if missing:
+		enqueue_snapshots(company, root_type, balance_must_be, filters, missing)
+
+	return build_rows(accounts, balances, root_type, balance_must_be, period_list, filters)
+
+
+def get_closed_periods(company, period_list, filters):
+	if not cint(filters.get("use_period_snapshots")):
+		return []
+
+	# accumulated balances are rebuilt from per-period ones, which needs the periods
+	# to start where get_data starts accumulating
+	if filters.accumulated_values and getdate(period_list[0].from_date) != getdate(
+		period_list[0].year_start_date
+	):
+		return []
+
+	closed_till = get_closed_till(company)
+	if not closed_till:
+		return []
+
+	return [period for period in period_list if getdate(period.to_date) <= closed_till]
+
+
+def get_closed_till(company):
+	"""End date of the latest submitted Period Closing Voucher of the company."""
+
+	def generator():
+		return frappe.db.get_value(
+			"Period Closing Voucher", {"company": company, "docstatus": 1}, "max(period_end_date)"
+		)
+
+	closed_till = frappe.cache.hget(CLOSED_TILL_KEY, company, generator)
+	return getdate(closed_till) if closed_till else None
+
+
+def get_filters_key(filters):
+	values = {k: v for k, v in filters.items() if k not in NON_BALANCE_FILTERS and v not in (None, "", [])}
+	return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_period_range(period):
+	return (getdate(period.from_date), getdate(period.to_date))
+
+
+def get_snapshots(company, root_type, filters_key, periods):
+	"""{(from_date, to_date): [snapshot rows]} for the periods that have a snapshot."""
+	snapshots = {}
+	for d in frappe.get_all(
+		"Profit and Loss Snapshot",
+		filters={
+			"company": company,
+			"root_type": root_type,
+			"filters_key": filters_key,
+			"from_date": (">=", min(getdate(p.from_date) for p in periods)),
+			"to_date": ("<=", max(getdate(p.to_date) for p in periods)),
+		},
+		fields=["from_date", "to_date", "balance", *ROW_FIELDS],
+	):
+		rows = snapshots.setdefault((getdate(d.from_date), getdate(d.to_date)), [])
+		# account-less rows only mark periods without any balance
+		if d.account:
+			rows.append(d)
+
+	return snapshots
+
+
+def enqueue_snapshots(company, root_type, balance_must_be, filters, periods):
+	frappe.enqueue(
+		build_snapshots,
+		queue="long",
+		# one job per tree and filters, a report run while it is queued does not add another
+		job_id="pl_snapshots:{0}:{1}:{2}".format(company, root_type, get_filters_key(filters)),
+		deduplicate=True,
+		company=company,
+		root_type=root_type,
+		balance_must_be=balance_must_be,
+		filters=dict(filters),
+		periods=periods,
+	)
+
+
+def build_snapshots(company, root_type, balance_must_be, filters, periods):
+	"""Snapshot the balances of the periods that are still closed and have no snapshot yet."""
+	filters = frappe._dict(filters)
+	filters_key = get_filters_key(filters)
+	closed_till = get_closed_till(company)
+	existing = get_snapshots(company, root_type, filters_key, periods)
+	periods = [
+		period
+		for period in periods
+		if closed_till and getdate(period.to_date) <= closed_till and get_period_range(period) not in existing
+	]
+	if not periods:
+		return
+
+	rows = get_data(
+		company,
+		root_type,
+		balance_must_be,
+		periods,
+		filters=filters,
+		accumulated_values=0,
+		ignore_closing_entries=True,
+	)
+	save_snapshots(company, root_type, filters_key, periods, [row for row in rows or [] if "parent_account" in row])
+
+
+def save_snapshots(company, root_type, filters_key, periods, rows):
+	timestamp, user = now(), frappe.session.user
+	values = []
+	for period in periods:
+		from_date, to_date = get_period_range(period)
+		base = (company, root_type, filters_key, from_date, to_date)
+
+		# marker row, so that a period without any balance still counts as snapshotted
+		values.append(
+			(frappe.generate_hash(), timestamp, timestamp, user, user, *base, None, None, None, 0, 0, None, 0, 0.0)
+		)
+		for row in rows:
+			if not row.get(period.key):
+				continue
+			values.append(
+				(
+					frappe.generate_hash(),
+					timestamp,
+					timestamp,
+					user,
+					user,
+					*base,
+					*(row.get(f) for f in ROW_FIELDS),
+					flt(row.get(period.key)),
+				)
+			)
+
+	frappe.db.bulk_insert("Profit and Loss Snapshot", SNAPSHOT_FIELDS, values)
+
+
+def build_rows(accounts, balances, root_type, balance_must_be, period_list, filters):
+	"""Rows in the shape `get_data` returns, from per-period (non-accumulated) balances."""
+	if not accounts:
+		return []
+
+	company_currency = filters.presentation_currency or frappe.get_cached_value(
+		"Company", filters.company, "default_currency"
+	)
+	year_start_date = period_list[0]["year_start_date"].strftime("%Y-%m-%d")
+	year_end_date = period_list[-1]["year_end_date"].strftime("%Y-%m-%d")
+
+	lft = dict(
+		frappe.get_all("Account", filters={"name": ("in", list(accounts))}, fields=["name", "lft"], as_list=True)
+	)
+
+	out = []
+	for account in sorted(accounts, key=lambda a: lft.get(a) or 0):
+		d = accounts[account]
+		row = frappe._dict({f: d.get(f) for f in ROW_FIELDS})
+		row.update(
+			{
+				"parent_account": d.parent_account or "",
+				"indent": flt(d.indent),
+				"year_start_date": year_start_date,
+				"year_end_date": year_end_date,
+				"currency": company_currency,
+				"opening_balance": 0.0,
+			}
+		)
+
+		has_value, total, running = False, 0, 0.0
+		for period in period_list:
+			value = flt(balances[account].get(period.key))
+			if filters.accumulated_values:
+				running += value
+				value = running
+			row[period.key] = flt(value, 3)
+			if abs(row[period.key]) >= 0.005:
+				has_value = True
+				total += flt(row[period.key])
+
+		row["has_value"] = has_value
+		row["total"] = total
+		out.append(row)
+
+	out = filter_out_zero_value_rows(out, filters.get("show_zero_values"))
+	add_total_row(out, root_type, balance_must_be, period_list, company_currency)
+	return out
+
+
+def filter_out_zero_value_rows(rows, show_zero_values=False):
+	# show a group with zero balance when one of its children has a balance
+	children_with_value = {row.parent_account for row in rows if row.has_value}
+	return [row for row in rows if show_zero_values or row.has_value or row.account in children_with_value]
+
+
+def clear_closed_till(company):
+	frappe.cache.hdel(CLOSED_TILL_KEY, company)
+
+
+def delete_snapshots(company, after=None, posting_date=None):
+	"""Delete the company's snapshots ending after `after`, or covering `posting_date` (all of them without either)."""
+	filters = {"company": company}
+	if after:
+		filters["to_date"] = (">", after)
+	if posting_date:
+		filters["from_date"] = ("<=", posting_date)
+		filters["to_date"] = (">=", posting_date)
+
+	frappe.db.delete("Profit and Loss Snapshot", filters)
@@ -31,3 +31,19 @@ frappe.query_reports["Profit and Loss Tabrah"]["filters"].push({
 	fieldtype: "Check",
 	default: 1,
 });
+
+frappe.query_reports["Profit and Loss Tabrah"]["filters"].push({
+	fieldname: "use_period_snapshots",
+	label: __("Use Closed Period Snapshots"),
+	fieldtype: "Check",
+	default: 1,
+});
+
+frappe.query_reports["Profit and Loss Tabrah"]["filters"].push({
+	fieldname: "companies",
+	label: __("Consolidate Companies"),
+	fieldtype: "MultiSelectList",
+	get_data: function (txt) {
+		return frappe.db.get_link_options("Company", txt);
+	},
+});
@@ -2,6 +2,7 @@
 # License: GNU General Public License v3. See license.txt
 
 import frappe
+import numpy as np
 from frappe import _
 from frappe.utils import flt
 
@@ -9,12 +10,18 @@ from erpnext.accounts.report.financial_statements import (
 	compute_growth_view_data,
 	compute_margin_view_data,
 	get_columns,
-	get_data,
-	get_filtered_list_for_consolidated_report,
 	get_period_list,
 )
 
+from zajel_general.zajel_general.report.profit_and_loss_tabrah.consolidation import (
+	get_companies,
+	get_consolidated_data,
+)
+from zajel_general.zajel_general.report.profit_and_loss_tabrah.period_snapshots import get_statement_data
+
 def execute(filters=None):
+	# runs as a prepared report, progress goes to the user waiting on it
+	publish_progress(0, _("Building period list"))
 	period_list = get_period_list(
 		filters.from_fiscal_year,
 		filters.to_fiscal_year,
@@ -25,29 +32,24 @@ def execute(filters=None):
 		company=filters.company,
 	)
 
-	income = get_data(
-		filters.company,
-		"Income",
-		"Credit",
-		period_list,
-		filters=filters,
-		accumulated_values=filters.accumulated_values,
-		ignore_closing_entries=True,
+	currency = filters.presentation_currency or frappe.get_cached_value(
+		"Company", filters.company, "default_currency"
 	)
 
-	expense = get_data(
-		filters.company,
-		"Expense",
-		"Debit",
-		period_list,
-		filters=filters,
-		accumulated_values=filters.accumulated_values,
-		ignore_closing_entries=True,
-	)
+	publish_progress(10, _("Period list built"))
 
-	net_profit_loss = get_net_profit_loss(
-		income, expense, period_list, filters.company, filters.presentation_currency
-	)
+	companies = get_companies(filters)
+	if companies:
+		income, expense = get_consolidated_data(companies, period_list, filters, currency)
+		publish_progress(70, _("Income and expense done"))
+	else:
+		income = get_statement_data(filters.company, "Income", "Credit", period_list, filters)
+		publish_progress(40, _("Income done"))
+
+		expense = get_statement_data(filters.company, "Expense", "Debit", period_list, filters)
+		publish_progress(70, _("Expense done"))
+
+	net_profit_loss = get_net_profit_loss(income, expense, period_list, filters.company, currency)
 
 	data = []
 	data.extend(income or [])
@@ -65,38 +67,9 @@ def execute(filters=None):
 		"width": 110
 	})
 
-	# Build a mapping of parent account totals
-	parent_map = {}
-	for row in data:
-		if row.get("parent_account") and row.get("account") and isinstance(row.get("account"), str):
-			parent_map.setdefault(row["parent_account"], 0)
-			for period in period_list:
-				key = period.key
-				parent_map[row["parent_account"]] += flt(row.get(key))
-
-	# Assign ratio value for each row
-	for row in data:
-		parent = row.get("parent_account")
-		if parent:
-			total_ratio = []
-			for period in period_list:
-				key = period.key
-				val = flt(row.get(key))
-				parent_total = parent_map.get((parent))
-				if parent_total and val:
-					percent = val / parent_total * 100
-					total_ratio.append(percent)
-			if total_ratio:
-				# Use average percentage across periods if more than one
-				row["ratio"] = f"{sum(total_ratio)/len(total_ratio):.2f}%"
-			else:
-				row["ratio"] = ""
-		else:
-			row["ratio"] = ""
+	set_parent_ratio(data, period_list)
+	publish_progress(90, _("Ratios done"))
 
-	currency = filters.presentation_currency or frappe.get_cached_value(
-		"Company", filters.company, "default_currency"
-	)
 	chart = get_chart_data(filters, columns, income, expense, net_profit_loss, currency)
 
 	report_summary, primitive_summary = get_report_summary(
@@ -109,20 +82,64 @@ def execute(filters=None):
 	if filters.get("selected_view") == "Margin":
 		compute_margin_view_data(data, period_list, filters.accumulated_values)
 
+	publish_progress(100, _("Done"))
 	return columns, data, None, chart, report_summary, primitive_summary
 
+
+def publish_progress(percent, description):
+	frappe.publish_progress(percent, title=_("Profit and Loss Tabrah"), description=description)
+
+
 # Other functions (get_report_summary, get_net_profit_loss, get_chart_data) remain unchanged
 
 
+def set_parent_ratio(data, period_list):
+	"""
+	Set "ratio" (% of Parent) on every row: the row's value as a percentage of its parent's
+	total over all periods, averaged over the periods where both are non-zero.
+	"""
+	if not data:
+		return
+
+	keys = [period.key for period in period_list]
+	# accounts x periods
+	values = np.array([[row.get(key) or 0.0 for key in keys] for row in data], dtype=float).reshape(
+		len(data), len(keys)
+	)
+
+	parent_index, parents = [], {}
+	for row in data:
+		parent = row.get("parent_account")
+		parent_index.append(parents.setdefault(parent, len(parents)) if parent else -1)
+	# rows without a parent point at -1, an extra slot that never gets a total
+	parent_index = np.array(parent_index, dtype=int)
+
+	# parent totals come from the account rows only, summed in row order
+	is_account = np.array([isinstance(row.get("account"), str) and bool(row.get("account")) for row in data])
+	contributes = (parent_index >= 0) & is_account
+	parent_totals = np.zeros(len(parents) + 1)
+	np.add.at(parent_totals, np.repeat(parent_index[contributes], len(keys)), values[contributes].ravel())
+	has_total = np.zeros(len(parents) + 1, dtype=bool)
+	has_total[parent_index[contributes]] = True
+
+	row_totals = np.where(has_total[parent_index], parent_totals[parent_index], 0.0)
+
+	with np.errstate(divide="ignore", invalid="ignore"):
+		percent = values / row_totals[:, None] * 100
+	counted = (values != 0) & (row_totals != 0)[:, None]
+	counts = counted.sum(axis=1)
+	# cumulative sum adds left to right, like summing the per-period list
+	sums = np.cumsum(np.where(counted, percent, 0.0), axis=1)[:, -1] if keys else np.zeros(len(data))
+
+	for row, total, count in zip(data, sums, counts):
+		row["ratio"] = f"{total / count:.2f}%" if count else ""
+
+
 def get_report_summary(
 	period_list, periodicity, income, expense, net_profit_loss, currency, filters, consolidated=False
 ):
 	net_income, net_expense, net_profit = 0.0, 0.0, 0.0
 
-	# from consolidated financial statement
-	if filters.get("accumulated_in_group_company"):
-		period_list = get_filtered_list_for_consolidated_report(filters, period_list)
-
 	if filters.accumulated_values:
 		# when 'accumulated_values' is enabled, periods have running balance.
 		# so, last period will have the net amount.